@@ -40,6 +40,61 @@ except ImportError:
     print("[WARNING] Module oracledb non installé → simulation forcée")
 
 
+# =========================================================
+# DONNÉES SÉCURITÉ SIMULÉES (tuples + schéma fixe)
+# =========================================================
+SIM_USERS_COLS = ('USERNAME', 'ACCOUNT_STATUS', 'PROFILE', 'CREATED',
+                  'EXPIRY_DATE', 'LOCK_DATE', 'ROLES')
+SIM_USERS_ROWS = (
+    ("APP_ADMIN", "OPEN", "APP_PROFILE", "2024-01-15 09:30:00", "2024-07-15 09:30:00", None, "APP_ADMIN_ROLE"),
+    ("ETL_USER", "OPEN", "ETL_PROFILE", "2024-02-20 08:45:00", "2024-08-20 08:45:00", None, "ETL_ROLE"),
+    ("ANALYST_JOHN", "OPEN", "ANALYST_PROFILE", "2024-05-18 15:25:00", "2024-11-18 15:25:00", None, "ANALYST_ROLE"),
+)
+SIM_USERS_DTYPES = {'CREATED': 'datetime64[ns]', 'EXPIRY_DATE': 'datetime64[ns]'}
+
+SIM_PRIVILEGES_COLS = ('GRANTEE', 'PRIVILEGE', 'ADMIN_OPTION')
+SIM_PRIVILEGES_ROWS = (
+    ("APP_ADMIN", "CREATE ANY TABLE", "YES"),
+    ("ETL_USER", "SELECT ANY TABLE", "NO"),
+    ("ANALYST_JOHN", "EXECUTE ANY PROCEDURE", "NO"),
+)
+
+SIM_PROFILES_COLS = ('PROFILE', 'PARAMETER', 'VALUE')
+SIM_PROFILES_ROWS = (
+    ("DEFAULT", "PASSWORD_LIFE_TIME", "180"),
+    ("DEFAULT", "FAILED_LOGIN_ATTEMPTS", "10"),
+    ("WEAK_PROFILE", "PASSWORD_LIFE_TIME", "UNLIMITED"),
+    ("WEAK_PROFILE", "FAILED_LOGIN_ATTEMPTS", "UNLIMITED"),
+)
+
+SIM_ROLES_COLS = ('ROLE', 'PRIVILEGE', 'ADMIN_OPTION', 'TYPE')
+SIM_ROLES_ROWS = (
+    ("APP_ADMIN_ROLE", "CREATE TABLE", "NO", "SYSTEM"),
+    ("ETL_ROLE", "SELECT ANY TABLE", "NO", "SYSTEM"),
+)
+
+# Mots-clés SQL pilotant les plans factices (un seul scan, sans upper())
+_SQL_KW_RE = re.compile(r'\b(?:(JOIN)|(GROUP\s+BY)|(WHERE))\b', re.IGNORECASE)
+_SQL_KW_NAMES = (None, 'JOIN', 'GROUP BY', 'WHERE')
+
+
+# Littéraux DATE à convertir en TO_DATE pour EXPLAIN PLAN
+_DATE_ISO_QUOTED_RE = re.compile(r"DATE\s+'(\d{4}-\d{2}-\d{2})'", re.IGNORECASE)
+_DATE_ISO_BARE_RE = re.compile(r"DATE\s+(\d{4}-\d{2}-\d{2})")
+_DATE_MON_RE = re.compile(r"DATE\s+'(\d{2}-[A-Z]{3}-\d{2})'", re.IGNORECASE)
+
+# Tables référencées, par clause (l'ordre des motifs fixe l'ordre des résultats)
+_TABLE_NAME_RES = tuple(
+    re.compile(rf'{kw}\s+([a-zA-Z_][a-zA-Z0-9_]*)', re.IGNORECASE)
+    for kw in ('FROM', 'JOIN', 'UPDATE', 'INTO')
+)
+
+
+def _sql_keywords(sql_text):
+    """Retourne l'ensemble des mots-clés JOIN / GROUP BY / WHERE présents"""
+    return {_SQL_KW_NAMES[m.lastindex] for m in _SQL_KW_RE.finditer(sql_text)}
+
+
 class OracleDataExtractor:
     
     # =========================================================
@@ -89,6 +144,10 @@ class OracleDataExtractor:
         self.service = os.getenv("ORACLE_SERVICE", "XEPDB1")
         self.user = os.getenv("ORACLE_USER", "system")
         self.password = os.getenv("ORACLE_PASSWORD", "")
+        # Nombre de lignes écrites par fichier (évite de relire les CSV au résumé)
+        self._row_counts = {}
+        # Cache (owner, table) -> ligne all_tables/all_views (None = absent)
+        self._tbl_meta_cache = {}
 
         if not use_simulation and ORACLEDB_AVAILABLE:
             self._connect_oracle_21c()
@@ -129,28 +188,17 @@ class OracleDataExtractor:
     # =========================================================
     def _fix_date_literals(self, sql_text):
         """Corrige les littéraux DATE 'YYYY-MM-DD' pour EXPLAIN PLAN"""
-        import re
-        
         if not sql_text or not isinstance(sql_text, str):
             return sql_text
         
-        # Pattern pour DATE 'YYYY-MM-DD'
-        pattern = r"DATE\s+'(\d{4}-\d{2}-\d{2})'"
+        # DATE 'YYYY-MM-DD'
+        fixed_sql = _DATE_ISO_QUOTED_RE.sub(r"TO_DATE('\1', 'YYYY-MM-DD')", sql_text)
         
-        def replace_date(match):
-            date_str = match.group(1)
-            return f"TO_DATE('{date_str}', 'YYYY-MM-DD')"
+        # DATE sans guillemets simples
+        fixed_sql = _DATE_ISO_BARE_RE.sub(r"TO_DATE('\1', 'YYYY-MM-DD')", fixed_sql)
         
-        # Appliquer la correction
-        fixed_sql = re.sub(pattern, replace_date, sql_text, flags=re.IGNORECASE)
-        
-        # Pattern pour DATE sans guillemets simples
-        pattern2 = r"DATE\s+(\d{4}-\d{2}-\d{2})"
-        fixed_sql = re.sub(pattern2, lambda m: f"TO_DATE('{m.group(1)}', 'YYYY-MM-DD')", fixed_sql)
-        
-        # Pattern pour DATE avec format différent
-        pattern3 = r"DATE\s+'(\d{2}-[A-Z]{3}-\d{2})'"
-        fixed_sql = re.sub(pattern3, lambda m: f"TO_DATE('{m.group(1)}', 'DD-MON-YY')", fixed_sql, flags=re.IGNORECASE)
+        # DATE avec format différent
+        fixed_sql = _DATE_MON_RE.sub(r"TO_DATE('\1', 'DD-MON-YY')", fixed_sql)
         
         return fixed_sql
 
@@ -282,6 +330,7 @@ class OracleDataExtractor:
             privileges_df.to_csv("data/security_privileges.csv", index=False, encoding='utf-8')
             profiles_df.to_csv("data/security_profiles.csv", index=False, encoding='utf-8')
             roles_df.to_csv("data/security_roles.csv", index=False, encoding='utf-8')
+            self._record_security_counts(users_df, privileges_df, profiles_df, roles_df)
             
             return {
                 "users": users_df,
@@ -340,6 +389,7 @@ class OracleDataExtractor:
             if metrics:
                 df = pd.DataFrame([metrics])
                 df.to_csv("data/db_metrics.csv", index=False, encoding='utf-8')
+                self._row_counts["db_metrics.csv"] = len(df)
                 print(f"      ✅ Métriques extraites: {len(metrics)} métriques")
                 return df
             else:
@@ -656,34 +706,13 @@ class OracleDataExtractor:
         tables = self._extract_table_names(sql_text)
         
         for table in tables[:3]:  # Limiter à 3 tables
+            cache_key = (current_schema, table)
             try:
-                # Vérifier si la table existe et obtenir des infos
-                check_query = f"""
-                    SELECT 
-                        owner,
-                        table_name,
-                        tablespace_name,
-                        num_rows,
-                        blocks,
-                        last_analyzed
-                    FROM all_tables 
-                    WHERE table_name = :1 
-                    AND owner = :2
-                    UNION ALL
-                    SELECT 
-                        owner,
-                        view_name as table_name,
-                        NULL as tablespace_name,
-                        NULL as num_rows,
-                        NULL as blocks,
-                        NULL as last_analyzed
-                    FROM all_views 
-                    WHERE view_name = :1 
-                    AND owner = :2
-                """
-                
-                self.cursor.execute(check_query, [table, current_schema])
-                result = self.cursor.fetchone()
+                if cache_key in self._tbl_meta_cache:
+                    result = self._tbl_meta_cache[cache_key]
+                else:
+                    result = self._fetch_table_metadata(table, current_schema)
+                    self._tbl_meta_cache[cache_key] = result
                 
                 if result:
                     objects.append({
@@ -710,12 +739,41 @@ class OracleDataExtractor:
         
         return objects
 
+    def _fetch_table_metadata(self, table, owner):
+        """Lit les infos d'une table/vue dans all_tables/all_views (None si absente)"""
+        check_query = """
+            SELECT 
+                owner,
+                table_name,
+                tablespace_name,
+                num_rows,
+                blocks,
+                last_analyzed
+            FROM all_tables 
+            WHERE table_name = :1 
+            AND owner = :2
+            UNION ALL
+            SELECT 
+                owner,
+                view_name as table_name,
+                NULL as tablespace_name,
+                NULL as num_rows,
+                NULL as blocks,
+                NULL as last_analyzed
+            FROM all_views 
+            WHERE view_name = :1 
+            AND owner = :2
+        """
+        
+        self.cursor.execute(check_query, [table, owner])
+        return self.cursor.fetchone()
+
     def _generate_mock_plan_based_on_sql(self, sql_text):
         """Génère un plan factice basé sur l'analyse de la requête SQL"""
-        sql_upper = sql_text.upper()
+        keywords = _sql_keywords(sql_text)
         
         # Déterminer le type de requête
-        if 'JOIN' in sql_upper:
+        if 'JOIN' in keywords:
             # Plan pour une jointure
             return pd.DataFrame([
                 {'id': 0, 'operation': 'SELECT STATEMENT', 'options': '', 
@@ -727,7 +785,7 @@ class OracleDataExtractor:
                 {'id': 3, 'operation': 'TABLE ACCESS', 'options': 'FULL', 
                 'object_name': 'TABLE2', 'object_type': 'TABLE', 'cost': 700, 'cardinality': 5000, 'bytes': 250000}
             ])
-        elif 'GROUP BY' in sql_upper:
+        elif 'GROUP BY' in keywords:
             # Plan pour un GROUP BY
             return pd.DataFrame([
                 {'id': 0, 'operation': 'SELECT STATEMENT', 'options': '', 
@@ -760,8 +818,13 @@ class OracleDataExtractor:
         
         # Si le plan a seulement 1-2 étapes, ajouter des détails
         if len(plan_df) <= 2:
-            base_cost = plan_df.iloc[0]['cost'] if 'cost' in plan_df.columns and not pd.isna(plan_df.iloc[0]['cost']) else 1000
-            
+            base_cost = 1000
+            if 'cost' in plan_df.columns:
+                # Accès scalaire direct (NaN != NaN → valeur manquante)
+                first_cost = plan_df['cost'].iat[0]
+                if first_cost is not None and first_cost == first_cost:
+                    base_cost = first_cost
+
             # Créer un plan enrichi
             enriched_rows = [
                 {'id': 0, 'operation': 'SELECT STATEMENT', 'options': '', 
@@ -770,9 +833,7 @@ class OracleDataExtractor:
             ]
             
             # Ajouter des opérations selon le type de requête
-            sql_upper = sql_text.upper()
-            
-            if 'WHERE' in sql_upper:
+            if 'WHERE' in _sql_keywords(sql_text):
                 enriched_rows.append({
                     'id': 1, 'operation': 'TABLE ACCESS', 'options': 'BY INDEX ROWID', 
                     'object_name': 'USER_TABLE', 'object_type': 'TABLE', 
@@ -800,19 +861,11 @@ class OracleDataExtractor:
             return []
         
         tables = []
-        patterns = [
-            r'FROM\s+([a-zA-Z_][a-zA-Z0-9_]*)',
-            r'JOIN\s+([a-zA-Z_][a-zA-Z0-9_]*)',
-            r'UPDATE\s+([a-zA-Z_][a-zA-Z0-9_]*)',
-            r'INTO\s+([a-zA-Z_][a-zA-Z0-9_]*)'
-        ]
-        
-        for pattern in patterns:
-            matches = re.findall(pattern, sql_text, re.IGNORECASE)
-            tables.extend(matches)
+        for pattern in _TABLE_NAME_RES:
+            tables.extend(pattern.findall(sql_text))
         
-        # Nettoyer et dédupliquer
-        tables = list(set([t.upper() for t in tables if t and len(t) > 1]))
+        # Nettoyer et dédupliquer (ordre d'apparition conservé)
+        tables = list({t.upper(): None for t in tables if t and len(t) > 1})
         return tables[:5]
 
     def _save_queries_data(self, slow_queries_df, queries_details):
@@ -834,23 +887,41 @@ class OracleDataExtractor:
             main_df = main_df.assign(PLAN_HASH_VALUE=slow_queries_df['PLAN_HASH_VALUE'].values)
         
         main_df.to_csv("data/slow_queries_detailed.csv", index=False, encoding='utf-8')
+        self._row_counts["slow_queries_detailed.csv"] = len(main_df)
         
         # Sauvegarder JSON structuré pour l'analyse
         with open("data/queries_for_optimization.json", "w", encoding='utf-8') as f:
             json.dump(queries_details, f, indent=2, default=str)
+        self._row_counts["queries_for_optimization.json"] = len(queries_details)
         
         # Créer CSV des plans d'exécution
-        all_plans = []
-        for q in queries_details:
-            for plan in q['execution_plan']:
-                plan['sql_id'] = q['sql_id']
-                all_plans.append(plan)
-        
-        plans_df = pd.DataFrame(all_plans)
+        plans_df = self._build_plans_df(queries_details)
         plans_df.to_csv("data/execution_plans.csv", index=False, encoding='utf-8')
+        self._row_counts["execution_plans.csv"] = len(plans_df)
         
         print(f"      ✅ Fichiers MODULE 5 sauvegardés")
 
+    def _build_plans_df(self, queries_details):
+        """Aplatit les plans de toutes les requêtes (sans modifier les dicts d'origine)"""
+        plan_cols = list(dict.fromkeys(
+            key for q in queries_details for plan in q['execution_plan'] for key in plan
+        ))
+        rows = [
+            tuple(plan.get(col) for col in plan_cols) + (q['sql_id'],)
+            for q in queries_details
+            for plan in q['execution_plan']
+        ]
+        return pd.DataFrame(rows, columns=plan_cols + ['sql_id'])
+
+    def _record_security_counts(self, users_df, privileges_df, profiles_df, roles_df):
+        """Mémorise le nombre de lignes des CSV sécurité écrits"""
+        self._row_counts.update({
+            "security_users.csv": len(users_df),
+            "security_privileges.csv": len(privileges_df),
+            "security_profiles.csv": len(profiles_df),
+            "security_roles.csv": len(roles_df)
+        })
+
     # =========================================================
     # GÉNÉRATION SIMULATION (si connexion échoue) - INCHANGÉ
     # =========================================================
@@ -858,45 +929,19 @@ class OracleDataExtractor:
         """Génération données sécurité (simulation)"""
         print("   🔐 Génération données sécurité (simulation)...")
         
-        users_data = [
-            {"USERNAME": "APP_ADMIN", "ACCOUNT_STATUS": "OPEN", "PROFILE": "APP_PROFILE", 
-             "CREATED": "2024-01-15 09:30:00", "EXPIRY_DATE": "2024-07-15 09:30:00", 
-             "LOCK_DATE": None, "ROLES": "APP_ADMIN_ROLE"},
-            {"USERNAME": "ETL_USER", "ACCOUNT_STATUS": "OPEN", "PROFILE": "ETL_PROFILE", 
-             "CREATED": "2024-02-20 08:45:00", "EXPIRY_DATE": "2024-08-20 08:45:00", 
-             "LOCK_DATE": None, "ROLES": "ETL_ROLE"},
-            {"USERNAME": "ANALYST_JOHN", "ACCOUNT_STATUS": "OPEN", "PROFILE": "ANALYST_PROFILE", 
-             "CREATED": "2024-05-18 15:25:00", "EXPIRY_DATE": "2024-11-18 15:25:00", 
-             "LOCK_DATE": None, "ROLES": "ANALYST_ROLE"},
-        ]
-        
-        privileges_data = [
-            {"GRANTEE": "APP_ADMIN", "PRIVILEGE": "CREATE ANY TABLE", "ADMIN_OPTION": "YES"},
-            {"GRANTEE": "ETL_USER", "PRIVILEGE": "SELECT ANY TABLE", "ADMIN_OPTION": "NO"},
-            {"GRANTEE": "ANALYST_JOHN", "PRIVILEGE": "EXECUTE ANY PROCEDURE", "ADMIN_OPTION": "NO"},
-        ]
-        
-        profiles_data = [
-            {"PROFILE": "DEFAULT", "PARAMETER": "PASSWORD_LIFE_TIME", "VALUE": "180"},
-            {"PROFILE": "DEFAULT", "PARAMETER": "FAILED_LOGIN_ATTEMPTS", "VALUE": "10"},
-            {"PROFILE": "WEAK_PROFILE", "PARAMETER": "PASSWORD_LIFE_TIME", "VALUE": "UNLIMITED"},
-            {"PROFILE": "WEAK_PROFILE", "PARAMETER": "FAILED_LOGIN_ATTEMPTS", "VALUE": "UNLIMITED"},
-        ]
-        
-        roles_data = [
-            {"ROLE": "APP_ADMIN_ROLE", "PRIVILEGE": "CREATE TABLE", "ADMIN_OPTION": "NO", "TYPE": "SYSTEM"},
-            {"ROLE": "ETL_ROLE", "PRIVILEGE": "SELECT ANY TABLE", "ADMIN_OPTION": "NO", "TYPE": "SYSTEM"},
-        ]
-        
-        users_df = pd.DataFrame(users_data)
-        privileges_df = pd.DataFrame(privileges_data)
-        profiles_df = pd.DataFrame(profiles_data)
-        roles_df = pd.DataFrame(roles_data)
+        # Allocation typée unique (colonnes + dtypes connus d'avance)
+        users_df = pd.DataFrame.from_records(
+            SIM_USERS_ROWS, columns=SIM_USERS_COLS
+        ).astype(SIM_USERS_DTYPES)
+        privileges_df = pd.DataFrame.from_records(SIM_PRIVILEGES_ROWS, columns=SIM_PRIVILEGES_COLS)
+        profiles_df = pd.DataFrame.from_records(SIM_PROFILES_ROWS, columns=SIM_PROFILES_COLS)
+        roles_df = pd.DataFrame.from_records(SIM_ROLES_ROWS, columns=SIM_ROLES_COLS)
         
         users_df.to_csv("data/security_users.csv", index=False, encoding='utf-8')
         privileges_df.to_csv("data/security_privileges.csv", index=False, encoding='utf-8')
         profiles_df.to_csv("data/security_profiles.csv", index=False, encoding='utf-8')
         roles_df.to_csv("data/security_roles.csv", index=False, encoding='utf-8')
+        self._record_security_counts(users_df, privileges_df, profiles_df, roles_df)
         
         print(f"      ✅ Données générées: {len(users_df)} users, {len(privileges_df)} privs")
         
@@ -919,6 +964,7 @@ class OracleDataExtractor:
         }])
         
         df.to_csv("data/db_metrics.csv", index=False, encoding='utf-8')
+        self._row_counts["db_metrics.csv"] = len(df)
         print(f"      ✅ Métriques générées")
         return df
     
@@ -1063,6 +1109,7 @@ class OracleDataExtractor:
         # Sauvegarder fichiers pour MODULE 5
         with open("data/queries_for_optimization.json", "w", encoding='utf-8') as f:
             json.dump(queries_details, f, indent=2, default=str)
+        self._row_counts["queries_for_optimization.json"] = len(queries_details)
         
         # Créer DataFrame pour CSV
         slow_data = []
@@ -1082,16 +1129,12 @@ class OracleDataExtractor:
         
         df = pd.DataFrame(slow_data)
         df.to_csv("data/slow_queries_detailed.csv", index=False, encoding='utf-8')
+        self._row_counts["slow_queries_detailed.csv"] = len(df)
         
         # Créer CSV des plans
-        all_plans = []
-        for q in queries_details:
-            for plan in q['execution_plan']:
-                plan['sql_id'] = q['sql_id']
-                all_plans.append(plan)
-        
-        plans_df = pd.DataFrame(all_plans)
+        plans_df = self._build_plans_df(queries_details)
         plans_df.to_csv("data/execution_plans.csv", index=False, encoding='utf-8')
+        self._row_counts["execution_plans.csv"] = len(plans_df)
         
         print(f"      ✅ Données MODULE 5 générées: {len(queries_details)} requêtes avec plans")
         return queries_details
@@ -1112,6 +1155,8 @@ class OracleDataExtractor:
         print("="*60 + "\n")
 
         os.makedirs("data", exist_ok=True)
+        self._row_counts = {}
+        self._tbl_meta_cache = {}
 
         print("📊 Extraction des données...")
         print("-" * 40)
@@ -1161,6 +1206,13 @@ class OracleDataExtractor:
         ]
         
         for filename in files:
+            # Compteurs en mémoire : pas de relecture des fichiers écrits
+            if filename in self._row_counts:
+                count = self._row_counts[filename]
+                unit = "requêtes" if filename.endswith('.json') else "lignes"
+                print(f"✅ {filename:35} : {count:4} {unit}")
+                continue
+            
             filepath = f"data/{filename}"
             if os.path.exists(filepath):
                 try:
@@ -4,430 +4,725 @@ Génère tous les CSV nécessaires pour simuler une instance Oracle
 Conforme à l'énoncé : extraction depuis AUD$, V$SQL, DBA_USERS, etc.
 """
 
-import pandas as pd
-import random
+import numpy as np
 from datetime import datetime, timedelta
 import json
 import os
+import csv
+from pathlib import Path
+from concurrent.futures import ThreadPoolExecutor
+import hashlib
+import functools
+import contextlib
 
-def generate_audit_logs():
+try:
+    from numba import njit
+    NUMBA_AVAILABLE = True
+except ImportError:
+    NUMBA_AVAILABLE = False
+
+# pandas n'est importé qu'au premier besoin (ex: générer prompts.yaml n'en a pas besoin)
+_pd = None
+
+
+def _get_pd():
+    """Import paresseux de pandas (une seule fois)"""
+    global _pd
+    if _pd is None:
+        import pandas as pd
+        _pd = pd
+    return _pd
+
+
+# Copie CSV des métriques/config sécurité en plus du Parquet
+# (module7 et pages/performance lisent encore db_metrics.csv)
+CSV_COMPAT = os.getenv("CSV_COMPAT", "1") == "1"
+
+
+# =========================================================
+# DONNÉES STATIQUES (construites une fois, réécrites si modifiées)
+# =========================================================
+_SLOW_QUERIES = (
+    {
+        "query_id": "Q001",
+        "sql_text": "SELECT * FROM orders WHERE order_date > '2023-01-01'",
+        "execution_time_sec": 45.2,
+        "rows_processed": 1500000,
+        "buffer_gets": 250000,
+        "disk_reads": 12000,
+        "executions": 156,
+        "execution_plan": "TABLE ACCESS FULL | ORDERS | Cost: 5000 | Rows: 1.5M",
+        "cost": 5000,
+        "issue": "Full table scan sur 1.5M lignes - Index manquant sur ORDER_DATE",
+        "recommendation": "CREATE INDEX idx_orders_date ON orders(order_date)"
+    },
+    {
+        "query_id": "Q002",
+        "sql_text": "SELECT c.name, COUNT(o.id) FROM customers c JOIN orders o ON c.id = o.customer_id GROUP BY c.name",
+        "execution_time_sec": 32.8,
+        "rows_processed": 800000,
+        "buffer_gets": 180000,
+        "disk_reads": 8500,
+        "executions": 89,
+        "execution_plan": "HASH JOIN | Cost: 3200 | Rows: 800K",
+        "cost": 3200,
+        "issue": "Pas d'index sur customer_id - HASH JOIN coûteux",
+        "recommendation": "CREATE INDEX idx_orders_customer ON orders(customer_id)"
+    },
+    {
+        "query_id": "Q003",
+        "sql_text": "SELECT * FROM products WHERE UPPER(product_name) LIKE '%PHONE%'",
+        "execution_time_sec": 28.5,
+        "rows_processed": 500000,
+        "buffer_gets": 120000,
+        "disk_reads": 6000,
+        "executions": 234,
+        "execution_plan": "TABLE ACCESS FULL | PRODUCTS | Cost: 2800",
+        "cost": 2800,
+        "issue": "Fonction UPPER() empêche utilisation index - Leading wildcard",
+        "recommendation": "Créer index fonction-based OU réécrire sans fonction"
+    },
+    {
+        "query_id": "Q004",
+        "sql_text": "SELECT e.name, d.dept_name FROM employees e, departments d WHERE e.dept_id = d.id",
+        "execution_time_sec": 18.3,
+        "rows_processed": 300000,
+        "buffer_gets": 95000,
+        "disk_reads": 4200,
+        "executions": 67,
+        "execution_plan": "NESTED LOOPS | Cost: 1500",
+        "cost": 1500,
+        "issue": "Syntaxe OLD JOIN (Oracle 8i) - Non optimal",
+        "recommendation": "Réécrire avec JOIN explicite : FROM employees e JOIN departments d"
+    },
+    {
+        "query_id": "Q005",
+        "sql_text": "SELECT * FROM invoices WHERE invoice_date BETWEEN '2023-01-01' AND '2023-12-31'",
+        "execution_time_sec": 55.7,
+        "rows_processed": 2000000,
+        "buffer_gets": 320000,
+        "disk_reads": 15000,
+        "executions": 412,
+        "execution_plan": "INDEX RANGE SCAN | INVOICES_DATE_IDX | Cost: 6000",
+        "cost": 6000,
+        "issue": "Index existe mais sélectivité faible (trop de lignes retournées)",
+        "recommendation": "Partitionner table par année OU ajouter colonnes au SELECT"
+    },
+    {
+        "query_id": "Q006",
+        "sql_text": "SELECT DISTINCT customer_id FROM orders",
+        "execution_time_sec": 22.1,
+        "rows_processed": 1200000,
+        "buffer_gets": 210000,
+        "disk_reads": 9800,
+        "executions": 178,
+        "execution_plan": "SORT UNIQUE | Cost: 2500",
+        "cost": 2500,
+        "issue": "DISTINCT coûteux sur gros volume - Tri en mémoire",
+        "recommendation": "Utiliser GROUP BY customer_id (plus efficace avec index)"
+    },
+    {
+        "query_id": "Q007",
+        "sql_text": "SELECT * FROM transactions WHERE amount > (SELECT AVG(amount) FROM transactions)",
+        "execution_time_sec": 65.4,
+        "rows_processed": 3000000,
+        "buffer_gets": 450000,
+        "disk_reads": 18000,
+        "executions": 23,
+        "execution_plan": "SUBQUERY | TABLE ACCESS FULL | Cost: 8000",
+        "cost": 8000,
+        "issue": "Sous-requête scalaire exécutée pour chaque ligne",
+        "recommendation": "Utiliser WITH clause (CTE) pour calculer AVG une seule fois"
+    },
+    {
+        "query_id": "Q008",
+        "sql_text": "SELECT p.*, c.category_name FROM products p LEFT JOIN categories c ON p.category_id = c.id WHERE c.active = 1",
+        "execution_time_sec": 15.2,
+        "rows_processed": 250000,
+        "buffer_gets": 85000,
+        "disk_reads": 3500,
+        "executions": 145,
+        "execution_plan": "HASH JOIN OUTER | Cost: 1200",
+        "cost": 1200,
+        "issue": "Filtre WHERE sur table droite d'un LEFT JOIN - Convertit en INNER JOIN",
+        "recommendation": "Utiliser INNER JOIN directement OU déplacer filtre dans ON"
+    },
+    {
+        "query_id": "Q009",
+        "sql_text": "SELECT * FROM sales WHERE sales_date IN (SELECT date FROM calendar WHERE is_holiday = 1)",
+        "execution_time_sec": 38.9,
+        "rows_processed": 900000,
+        "buffer_gets": 165000,
+        "disk_reads": 7200,
+        "executions": 267,
+        "execution_plan": "NESTED LOOPS | SUBQUERY | Cost: 4000",
+        "cost": 4000,
+        "issue": "IN avec sous-requête - Exécution répétée de la sous-requête",
+        "recommendation": "Remplacer par JOIN : FROM sales s JOIN calendar c ON s.sales_date = c.date WHERE c.is_holiday = 1"
+    },
+    {
+        "query_id": "Q010",
+        "sql_text": "SELECT customer_id, SUM(amount) FROM orders GROUP BY customer_id HAVING SUM(amount) > 10000 ORDER BY SUM(amount) DESC",
+        "execution_time_sec": 42.6,
+        "rows_processed": 1800000,
+        "buffer_gets": 280000,
+        "disk_reads": 11000,
+        "executions": 98,
+        "execution_plan": "SORT GROUP BY | SORT ORDER BY | Cost: 4500",
+        "cost": 4500,
+        "issue": "Double tri (GROUP BY + ORDER BY) - Consommation mémoire élevée",
+        "recommendation": "Augmenter SORT_AREA_SIZE OU créer index sur (customer_id, amount)"
+    }
+)
+
+_SECURITY_CONFIG = (
+    {
+        "username": "SYSTEM",
+        "account_status": "OPEN",
+        "profile": "DEFAULT",
+        "created_date": "2020-01-15",
+        "lock_date": None,
+        "expiry_date": "2026-01-15",
+        "roles": "DBA,CONNECT,RESOURCE",
+        "system_privileges": "CREATE SESSION,CREATE TABLE,DROP ANY TABLE,ALTER SYSTEM",
+        "password_life_days": 90,
+        "failed_login_attempts": 0,
+        "last_login": "2026-01-06 14:23:15",
+        "risk_level": "CRITICAL",
+        "risk_reasons": "Compte système avec DBA role - Privilèges excessifs"
+    },
+    {
+        "username": "SYS",
+        "account_status": "OPEN",
+        "profile": "DEFAULT",
+        "created_date": "2020-01-15",
+        "lock_date": None,
+        "expiry_date": "2026-06-15",
+        "roles": "DBA,SYSDBA,SYSOPER",
+        "system_privileges": "ALL PRIVILEGES",
+        "password_life_days": 180,
+        "failed_login_attempts": 0,
+        "last_login": "2026-01-05 09:12:34",
+        "risk_level": "CRITICAL",
+        "risk_reasons": "Compte ultra-privilégié - Ne devrait pas être utilisé directement"
+    },
+    {
+        "username": "ADMIN_USER",
+        "account_status": "OPEN",
+        "profile": "ADMIN_PROFILE",
+        "created_date": "2023-03-10",
+        "lock_date": None,
+        "expiry_date": "2026-03-10",
+        "roles": "DBA,CONNECT",
+        "system_privileges": "CREATE SESSION,CREATE USER,DROP USER,GRANT ANY PRIVILEGE",
+        "password_life_days": 60,
+        "failed_login_attempts": 2,
+        "last_login": "2026-01-07 08:45:22",
+        "risk_level": "HIGH",
+        "risk_reasons": "Peut créer/supprimer users - 2 tentatives login échouées récentes"
+    },
+    {
+        "username": "APP_USER",
+        "account_status": "OPEN",
+        "profile": "APP_PROFILE",
+        "created_date": "2023-06-20",
+        "lock_date": None,
+        "expiry_date": "2026-06-20",
+        "roles": "CONNECT,RESOURCE",
+        "system_privileges": "CREATE SESSION,CREATE TABLE,CREATE VIEW",
+        "password_life_days": 90,
+        "failed_login_attempts": 0,
+        "last_login": "2026-01-07 10:15:43",
+        "risk_level": "MEDIUM",
+        "risk_reasons": "Compte applicatif standard - Privilèges appropriés"
+    },
+    {
+        "username": "READ_ONLY",
+        "account_status": "OPEN",
+        "profile": "LIMITED_PROFILE",
+        "created_date": "2024-01-05",
+        "lock_date": None,
+        "expiry_date": "2026-01-05",
+        "roles": "CONNECT",
+        "system_privileges": "CREATE SESSION",
+        "password_life_days": 120,
+        "failed_login_attempts": 0,
+        "last_login": "2026-01-06 16:30:12",
+        "risk_level": "LOW",
+        "risk_reasons": "Compte lecture seule - Sécurisé"
+    },
+    {
+        "username": "EXTERNAL_USER",
+        "account_status": "OPEN",
+        "profile": "DEFAULT",
+        "created_date": "2025-11-20",
+        "lock_date": None,
+        "expiry_date": "2026-02-20",
+        "roles": "CONNECT,RESOURCE,DBA",
+        "system_privileges": "CREATE SESSION,DROP ANY TABLE,CREATE USER,ALTER SYSTEM",
+        "password_life_days": 30,
+        "failed_login_attempts": 5,
+        "last_login": "2025-12-28 23:45:10",
+        "risk_level": "CRITICAL",
+        "risk_reasons": "Compte externe avec DBA - 5 tentatives échouées - Expiration courte - Login suspect (hors heures)"
+    },
+    {
+        "username": "TEST_USER",
+        "account_status": "EXPIRED",
+        "profile": "DEFAULT",
+        "created_date": "2024-06-10",
+        "lock_date": "2025-12-10",
+        "expiry_date": "2025-12-10",
+        "roles": "CONNECT",
+        "system_privileges": "CREATE SESSION",
+        "password_life_days": 0,
+        "failed_login_attempts": 10,
+        "last_login": "2025-11-30 14:20:05",
+        "risk_level": "HIGH",
+        "risk_reasons": "Compte expiré non désactivé - 10 tentatives échouées - Doit être supprimé"
+    },
+    {
+        "username": "ANALYST",
+        "account_status": "OPEN",
+        "profile": "ANALYST_PROFILE",
+        "created_date": "2024-09-15",
+        "lock_date": None,
+        "expiry_date": "2026-09-15",
+        "roles": "CONNECT,SELECT_CATALOG_ROLE",
+        "system_privileges": "CREATE SESSION,SELECT ANY TABLE",
+        "password_life_days": 90,
+        "failed_login_attempts": 1,
+        "last_login": "2026-01-07 09:30:45",
+        "risk_level": "MEDIUM",
+        "risk_reasons": "SELECT ANY TABLE privilège large - 1 tentative échouée"
+    }
+)
+
+_DB_METRICS = {
+    "database_name": "ORCL_PROD",
+    "instance_name": "ORCL",
+    "host_name": "db-server-01",
+    "db_version": "Oracle Database 19c Enterprise Edition Release 19.0.0.0.0",
+    "startup_time": None,  # daté à la génération
+    "db_size_gb": 2500,
+    "tablespaces_count": 12,
+    "datafiles_count": 48,
+    "users_count": 45,
+    "tables_count": 850,
+    "indexes_count": 1200,
+    "views_count": 320,
+    "daily_transactions": 5000000,
+    "peak_connections": 250,
+    "current_connections": 187,
+    "avg_response_time_ms": 120,
+    "cpu_usage_percent": 65,
+    "memory_total_gb": 256,
+    "memory_usage_gb": 128,
+    "sga_size_gb": 64,
+    "pga_size_gb": 32,
+    "disk_io_read_mbps": 450,
+    "disk_io_write_mbps": 320,
+    "network_traffic_mbps": 180,
+    "buffer_cache_hit_ratio": 98.5,
+    "library_cache_hit_ratio": 99.2,
+    "backup_frequency": "DAILY",
+    "last_full_backup": None,  # daté à la génération
+    "last_incremental_backup": None,  # daté à la génération
+    "backup_size_gb": 1800,
+    "rto_hours": 4,
+    "rpo_hours": 1,
+    "archivelog_mode": "ENABLED",
+    "flashback_enabled": "YES",
+    "rac_enabled": "NO",
+    "dataguard_enabled": "YES",
+    "criticality": "HIGH",
+    "environment": "PRODUCTION",
+    "compliance_standards": "SOX,GDPR,PCI-DSS"
+}
+
+
+def _content_key(data):
+    """Empreinte blake2b d'un littéral (détecte un contenu inchangé)"""
+    return hashlib.blake2b(repr(data).encode("utf-8"), digest_size=16).hexdigest()
+
+
+@contextlib.contextmanager
+def _atomic_write(path):
     """
-    Génère 70 logs d'audit (50 normaux + 20 suspects)
-    Simule : SELECT * FROM sys.aud$ WHERE timestamp > SYSDATE - 30
+    Fournit un chemin temporaire (<path>.tmp) remplacé atomiquement par la cible
+    en fin d'écriture : jamais de fichier à moitié écrit en cas d'interruption
     """
+    tmp_path = f"{path}.tmp"
+    try:
+        yield tmp_path
+        os.replace(tmp_path, path)
+    finally:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+
+
+def _to_parquet(df, path):
+    """
+    Écrit en Parquet (zstd) en gardant les types d'origine (int64/float64) :
+    le fichier relu par _load_cached_outputs est identique au DataFrame généré
+    """
+    with _atomic_write(path) as tmp_path:
+        df.to_parquet(tmp_path, engine="pyarrow", compression="zstd", index=False)
+
+
+def _write_csv(df, path):
+    """Écrit un CSV via le writer C++ de pyarrow (repli pandas si pyarrow absent)"""
+    try:
+        import pyarrow as pa
+        import pyarrow.csv as pacsv
+    except ImportError:
+        with _atomic_write(path) as tmp_path:
+            df.to_csv(tmp_path, index=False)
+        return
     
-    print("🔄 Génération des logs d'audit (simulation table AUD$)...")
-    
-    # Logs normaux (50) - Activité normale durant heures bureau
-    normal_logs = []
-    users = ["APP_USER", "ANALYST", "REPORT_USER", "ETL_USER", "READ_ONLY"]
-    actions = ["SELECT", "INSERT", "UPDATE"]
-    tables = ["CUSTOMERS", "ORDERS", "PRODUCTS", "INVOICES", "EMPLOYEES"]
-    
-    base_time = datetime.now() - timedelta(days=30)
-    
-    for i in range(50):
-        log = {
-            "log_id": f"LOG_{i+1:03d}",
-            "timestamp": (base_time + timedelta(
-                days=random.randint(0, 29),
-                hours=random.randint(8, 18),
-                minutes=random.randint(0, 59)
-            )).strftime("%Y-%m-%d %H:%M:%S"),
-            "username": random.choice(users),
-            "action": random.choice(actions),
-            "object_name": random.choice(tables),
-            "status": "SUCCESS",
-            "ip_address": f"192.168.1.{random.randint(10, 100)}",
-            "session_id": random.randint(1000, 9999),
-            "severity": "NORMAL"
-        }
-        normal_logs.append(log)
-    
-    # Logs suspects (20) - Activité anormale
-    suspect_logs = []
-    suspect_users = ["UNKNOWN_USER", "ADMIN", "SYS", "EXTERNAL_USER", "ROOT"]
-    suspect_actions = ["DROP", "ALTER", "GRANT", "CREATE USER", "DELETE", "TRUNCATE"]
-    sensitive_tables = ["USER_CREDENTIALS", "SALARY_INFO", "CREDIT_CARDS", "SYS.AUD$", "DBA_USERS"]
-    
-    for i in range(20):
-        log = {
-            "log_id": f"LOG_{i+51:03d}",
-            "timestamp": (base_time + timedelta(
-                days=random.randint(0, 29),
-                hours=random.choice([0, 1, 2, 3, 22, 23]),  # Heures suspectes
-                minutes=random.randint(0, 59)
-            )).strftime("%Y-%m-%d %H:%M:%S"),
-            "username": random.choice(suspect_users),
-            "action": random.choice(suspect_actions),
-            "object_name": random.choice(sensitive_tables),
-            "status": random.choice(["SUCCESS", "FAILED", "BLOCKED"]),
-            "ip_address": f"{random.randint(1, 255)}.{random.randint(0, 255)}.{random.randint(0, 255)}.{random.randint(0, 255)}",
-            "session_id": random.randint(10000, 99999),
-            "severity": random.choice(["SUSPECT", "CRITICAL", "HIGH"])
-        }
-        suspect_logs.append(log)
+    table = pa.Table.from_pandas(df, preserve_index=False)
+    with _atomic_write(path) as tmp_path, open(tmp_path, "wb", buffering=1 << 20) as f:
+        # Style de guillemets explicite (chaînes entre guillemets, CSV relu tel quel par pandas)
+        pacsv.write_csv(table, f, write_options=pacsv.WriteOptions(include_header=True, quoting_style="needed"))
+
+
+def _write_if_stale(df, path, key):
+    """
+    Écrit le fichier (CSV ou Parquet) sauf s'il existe avec la même empreinte (.hash)
+    et n'a pas été réécrit depuis par un autre module (ex: DataExtractor)
+    """
+    hash_path = f"{path}.hash"
+    if (os.path.exists(path) and os.path.exists(hash_path)
+            and os.path.getmtime(path) <= os.path.getmtime(hash_path)):
+        with open(hash_path, "r", encoding="utf-8") as f:
+            if f.read().strip() == key:
+                return False
     
-    # Combiner et mélanger
-    all_logs = normal_logs + suspect_logs
-    random.shuffle(all_logs)
+    if path.endswith(".parquet"):
+        _to_parquet(df, path)
+    else:
+        _write_csv(df, path)
+    with _atomic_write(hash_path) as tmp_path, open(tmp_path, "w", encoding="utf-8") as f:
+        f.write(key)
+    return True
+
+
+@functools.lru_cache(maxsize=1)
+def _build_slow_queries_df():
+    pd = _get_pd()
+    return pd.DataFrame(list(_SLOW_QUERIES))
+
+
+@functools.lru_cache(maxsize=1)
+def _build_security_config_df():
+    pd = _get_pd()
+    return pd.DataFrame(list(_SECURITY_CONFIG))
+
+
+@functools.lru_cache(maxsize=1)
+def _build_db_metrics_df(today):
+    """Métriques du jour (les champs datés sont figés pour la journée)"""
+    pd = _get_pd()
+    now = datetime.now()
+    metrics = {
+        **_DB_METRICS,
+        "startup_time": (now - timedelta(days=45)).strftime("%Y-%m-%d %H:%M:%S"),
+        "last_full_backup": (now - timedelta(days=1)).strftime("%Y-%m-%d"),
+        "last_incremental_backup": today
+    }
+    return pd.DataFrame([metrics])
+
+
+# =========================================================
+# TIRAGES DES LOGS D'AUDIT (NumPy, ou Numba pour les gros volumes)
+# =========================================================
+# Au-delà de ce volume, les tirages passent par le noyau Numba (si installé)
+NUMBA_MIN_ROWS = 100_000
+
+# Vocabulaires des logs normaux - Activité normale durant heures bureau
+_USERS = np.array(["APP_USER", "ANALYST", "REPORT_USER", "ETL_USER", "READ_ONLY"], dtype=object)
+_ACTIONS = np.array(["SELECT", "INSERT", "UPDATE"], dtype=object)
+_TABLES = np.array(["CUSTOMERS", "ORDERS", "PRODUCTS", "INVOICES", "EMPLOYEES"], dtype=object)
+
+# Vocabulaires des logs suspects - Activité anormale
+_SUSPECT_USERS = np.array(["UNKNOWN_USER", "ADMIN", "SYS", "EXTERNAL_USER", "ROOT"], dtype=object)
+_SUSPECT_ACTIONS = np.array(["DROP", "ALTER", "GRANT", "CREATE USER", "DELETE", "TRUNCATE"], dtype=object)
+_SENSITIVE_TABLES = np.array(["USER_CREDENTIALS", "SALARY_INFO", "CREDIT_CARDS", "SYS.AUD$", "DBA_USERS"], dtype=object)
+_SUSPECT_STATUSES = np.array(["SUCCESS", "FAILED", "BLOCKED"], dtype=object)
+_SUSPECT_SEVERITIES = np.array(["SUSPECT", "CRITICAL", "HIGH"], dtype=object)
+_SUSPECT_HOURS = np.array([0, 1, 2, 3, 22, 23], dtype=np.int64)
+
+# Tailles passées aux tirages (ordre attendu par _draw_logs_numpy / _draw_logs_jit)
+_VOCAB_SIZES = (len(_USERS), len(_SUSPECT_USERS), len(_ACTIONS), len(_SUSPECT_ACTIONS),
+                len(_TABLES), len(_SENSITIVE_TABLES), len(_SUSPECT_STATUSES), len(_SUSPECT_SEVERITIES))
+
+
+def _draw_logs_numpy(rng, n_normal, n_suspect, sizes):
+    """
+    Tirages NumPy : décalages temporels, indices dans les vocabulaires,
+    octets IP et sessions (normaux puis suspects)
+    """
+    n_users, n_suspect_users, n_actions, n_suspect_actions, n_tables, n_sensitive, n_status, n_severity = sizes
     
-    df = pd.DataFrame(all_logs)
-    df.to_csv("data/audit_logs.csv", index=False)
+    days = rng.integers(0, 30, n_normal + n_suspect)
+    hours = np.concatenate([
+        rng.integers(8, 19, n_normal),
+        _SUSPECT_HOURS[rng.integers(0, len(_SUSPECT_HOURS), n_suspect)]
+    ])
+    minutes = rng.integers(0, 60, n_normal + n_suspect)
+    user_idx = np.concatenate([rng.integers(0, n_users, n_normal), rng.integers(0, n_suspect_users, n_suspect)])
+    action_idx = np.concatenate([rng.integers(0, n_actions, n_normal), rng.integers(0, n_suspect_actions, n_suspect)])
+    table_idx = np.concatenate([rng.integers(0, n_tables, n_normal), rng.integers(0, n_sensitive, n_suspect)])
+    status_idx = rng.integers(0, n_status, n_suspect)
+    normal_octet = rng.integers(10, 101, n_normal)
+    # Un seul tirage (n_suspect, 4) ; premier octet non nul
+    octets = rng.integers([1, 0, 0, 0], 256, size=(n_suspect, 4))
+    session_ids = np.concatenate([rng.integers(1000, 10000, n_normal), rng.integers(10000, 100000, n_suspect)])
+    severity_idx = rng.integers(0, n_severity, n_suspect)
     
-    print(f"   ✅ {len(all_logs)} logs générés (50 normaux + 20 suspects)")
+    return (days, hours, minutes, user_idx, action_idx, table_idx,
+            status_idx, severity_idx, normal_octet, octets, session_ids)
+
+
+if NUMBA_AVAILABLE:
+    @njit(cache=True)
+    def _draw_logs_jit(n_normal, n_suspect, seed, sizes, suspect_hours):
+        """
+        Même contrat que _draw_logs_numpy, compilé par Numba.
+        Boucle séquentielle : un seul flux aléatoire => résultat reproductible pour un seed donné.
+        """
+        np.random.seed(seed)
+        n = n_normal + n_suspect
+        days = np.empty(n, np.int64)
+        hours = np.empty(n, np.int64)
+        minutes = np.empty(n, np.int64)
+        user_idx = np.empty(n, np.int64)
+        action_idx = np.empty(n, np.int64)
+        table_idx = np.empty(n, np.int64)
+        status_idx = np.empty(n_suspect, np.int64)
+        severity_idx = np.empty(n_suspect, np.int64)
+        normal_octet = np.empty(n_normal, np.int64)
+        octets = np.empty((n_suspect, 4), np.int64)
+        session_ids = np.empty(n, np.int64)
+        
+        for i in range(n):
+            days[i] = np.random.randint(0, 30)
+            minutes[i] = np.random.randint(0, 60)
+            if i < n_normal:
+                hours[i] = np.random.randint(8, 19)
+                user_idx[i] = np.random.randint(0, sizes[0])
+                action_idx[i] = np.random.randint(0, sizes[2])
+                table_idx[i] = np.random.randint(0, sizes[4])
+                normal_octet[i] = np.random.randint(10, 101)
+                session_ids[i] = np.random.randint(1000, 10000)
+            else:
+                j = i - n_normal
+                hours[i] = suspect_hours[np.random.randint(0, suspect_hours.shape[0])]
+                user_idx[i] = np.random.randint(0, sizes[1])
+                action_idx[i] = np.random.randint(0, sizes[3])
+                table_idx[i] = np.random.randint(0, sizes[5])
+                status_idx[j] = np.random.randint(0, sizes[6])
+                severity_idx[j] = np.random.randint(0, sizes[7])
+                octets[j, 0] = np.random.randint(1, 256)
+                for k in range(1, 4):
+                    octets[j, k] = np.random.randint(0, 256)
+                session_ids[i] = np.random.randint(10000, 100000)
+        
+        return (days, hours, minutes, user_idx, action_idx, table_idx,
+                status_idx, severity_idx, normal_octet, octets, session_ids)
+
+
+# Types explicites des colonnes (pas d'inférence à la construction / relecture)
+_AUDIT_SCHEMA = {
+    "log_id": "string",
+    "timestamp": "datetime64[ns]",
+    "username": "category",
+    "action": "category",
+    "object_name": "category",
+    "status": "category",
+    "ip_address": "string",
+    "session_id": "int32",
+    "severity": "category"
+}
+
+
+def _audit_column(name, values):
+    """Convertit une colonne de logs au type déclaré dans _AUDIT_SCHEMA"""
+    pd = _get_pd()
+    dtype = _AUDIT_SCHEMA[name]
+    if dtype == "datetime64[ns]":
+        return pd.to_datetime(np.asarray(values), format="%Y-%m-%d %H:%M:%S").astype(dtype)
+    return pd.array(values, dtype=dtype)
+
+
+def _read_audit_logs(path):
+    """Relit audit_logs.csv avec les types de _AUDIT_SCHEMA"""
+    pd = _get_pd()
+    df = pd.read_csv(path, dtype={name: dtype for name, dtype in _AUDIT_SCHEMA.items() if name != "timestamp"})
+    df["timestamp"] = _audit_column("timestamp", df["timestamp"])
     return df
 
 
-def generate_slow_queries():
+def generate_audit_logs(seed=42, return_df=True, n_normal=50, n_suspect=20, verbose=True):
+    """
+    Génère les logs d'audit (par défaut 70 : 50 normaux + 20 suspects)
+    Simule : SELECT * FROM sys.aud$ WHERE timestamp > SYSDATE - 30
+    
+    Tirages vectorisés NumPy (une seule opération par colonne) ; au-delà de
+    NUMBA_MIN_ROWS lignes, noyau Numba si disponible.
+    Le CSV est écrit directement depuis les colonnes ; le DataFrame
+    n'est construit que si return_df=True.
+    """
+    
+    if verbose:
+        print("🔄 Génération des logs d'audit (simulation table AUD$)...")
+    
+    rng = np.random.default_rng(seed)
+    base_time = np.datetime64(datetime.now() - timedelta(days=30), 's')
+    
+    n = n_normal + n_suspect
+    normal, suspect = slice(0, n_normal), slice(n_normal, n)
+    
+    if NUMBA_AVAILABLE and n >= NUMBA_MIN_ROWS:
+        draws = _draw_logs_jit(n_normal, n_suspect, seed, np.array(_VOCAB_SIZES, dtype=np.int64), _SUSPECT_HOURS)
+    else:
+        draws = _draw_logs_numpy(rng, n_normal, n_suspect, _VOCAB_SIZES)
+    (days, hours, minutes, user_idx, action_idx, table_idx,
+     status_idx, severity_idx, normal_octet, octets, session_ids) = draws
+    
+    # Colonnes pré-allouées (structure of arrays) : normaux puis suspects
+    log_ids = np.char.add("LOG_", np.char.zfill(np.arange(1, n + 1).astype(str), 3)).astype(object)
+    
+    # Un seul décalage en minutes -> une seule addition vectorisée (sans pandas)
+    offsets = (days * 1440 + hours * 60 + minutes).astype('timedelta64[m]')
+    timestamps = np.char.replace(np.datetime_as_string(base_time + offsets, unit='s'), "T", " ")
+    
+    usernames = np.empty(n, dtype=object)
+    usernames[normal] = _USERS[user_idx[normal]]
+    usernames[suspect] = _SUSPECT_USERS[user_idx[suspect]]
+    
+    action_col = np.empty(n, dtype=object)
+    action_col[normal] = _ACTIONS[action_idx[normal]]
+    action_col[suspect] = _SUSPECT_ACTIONS[action_idx[suspect]]
+    
+    object_names = np.empty(n, dtype=object)
+    object_names[normal] = _TABLES[table_idx[normal]]
+    object_names[suspect] = _SENSITIVE_TABLES[table_idx[suspect]]
+    
+    status = np.empty(n, dtype=object)
+    status[normal] = "SUCCESS"
+    status[suspect] = _SUSPECT_STATUSES[status_idx]
+    
+    ip_addresses = np.empty(n, dtype=object)
+    ip_addresses[normal] = np.char.add("192.168.1.", normal_octet.astype(str))
+    octets = octets.astype(str)
+    suspect_ips = octets[:, 0]
+    for k in range(1, 4):
+        suspect_ips = np.char.add(np.char.add(suspect_ips, "."), octets[:, k])
+    ip_addresses[suspect] = suspect_ips
+    
+    severity = np.empty(n, dtype=object)
+    severity[normal] = "NORMAL"
+    severity[suspect] = _SUSPECT_SEVERITIES[severity_idx]
+    
+    columns = {
+        "log_id": log_ids,
+        "timestamp": np.asarray(timestamps, dtype=object),
+        "username": usernames,
+        "action": action_col,
+        "object_name": object_names,
+        "status": status,
+        "ip_address": ip_addresses,
+        "session_id": session_ids,
+        "severity": severity
+    }
+    
+    # Mélanger (même permutation pour toutes les colonnes)
+    order = rng.permutation(n)
+    columns = {name: values[order] for name, values in columns.items()}
+    
+    # Écriture directe (pas de DataFrame intermédiaire)
+    with _atomic_write("data/audit_logs.csv") as tmp_path, \
+            open(tmp_path, "w", newline="", encoding="utf-8", buffering=1 << 20) as f:
+        writer = csv.writer(f)
+        writer.writerow(columns.keys())
+        writer.writerows(zip(*columns.values()))
+    
+    if verbose:
+        print(f"   ✅ {n} logs générés ({n_normal} normaux + {n_suspect} suspects)")
+    
+    if not return_df:
+        return None
+    
+    pd = _get_pd()
+    return pd.DataFrame({name: _audit_column(name, values) for name, values in columns.items()}, copy=False)
+
+
+def generate_slow_queries(verbose=True):
     """
     Génère 10 requêtes SQL lentes avec plans d'exécution
     Simule : SELECT * FROM v$sql WHERE elapsed_time > 1000000
     """
     
-    print("🔄 Génération des requêtes lentes (simulation V$SQL)...")
-    
-    queries = [
-        {
-            "query_id": "Q001",
-            "sql_text": "SELECT * FROM orders WHERE order_date > '2023-01-01'",
-            "execution_time_sec": 45.2,
-            "rows_processed": 1500000,
-            "buffer_gets": 250000,
-            "disk_reads": 12000,
-            "executions": 156,
-            "execution_plan": "TABLE ACCESS FULL | ORDERS | Cost: 5000 | Rows: 1.5M",
-            "cost": 5000,
-            "issue": "Full table scan sur 1.5M lignes - Index manquant sur ORDER_DATE",
-            "recommendation": "CREATE INDEX idx_orders_date ON orders(order_date)"
-        },
-        {
-            "query_id": "Q002",
-            "sql_text": "SELECT c.name, COUNT(o.id) FROM customers c JOIN orders o ON c.id = o.customer_id GROUP BY c.name",
-            "execution_time_sec": 32.8,
-            "rows_processed": 800000,
-            "buffer_gets": 180000,
-            "disk_reads": 8500,
-            "executions": 89,
-            "execution_plan": "HASH JOIN | Cost: 3200 | Rows: 800K",
-            "cost": 3200,
-            "issue": "Pas d'index sur customer_id - HASH JOIN coûteux",
-            "recommendation": "CREATE INDEX idx_orders_customer ON orders(customer_id)"
-        },
-        {
-            "query_id": "Q003",
-            "sql_text": "SELECT * FROM products WHERE UPPER(product_name) LIKE '%PHONE%'",
-            "execution_time_sec": 28.5,
-            "rows_processed": 500000,
-            "buffer_gets": 120000,
-            "disk_reads": 6000,
-            "executions": 234,
-            "execution_plan": "TABLE ACCESS FULL | PRODUCTS | Cost: 2800",
-            "cost": 2800,
-            "issue": "Fonction UPPER() empêche utilisation index - Leading wildcard",
-            "recommendation": "Créer index fonction-based OU réécrire sans fonction"
-        },
-        {
-            "query_id": "Q004",
-            "sql_text": "SELECT e.name, d.dept_name FROM employees e, departments d WHERE e.dept_id = d.id",
-            "execution_time_sec": 18.3,
-            "rows_processed": 300000,
-            "buffer_gets": 95000,
-            "disk_reads": 4200,
-            "executions": 67,
-            "execution_plan": "NESTED LOOPS | Cost: 1500",
-            "cost": 1500,
-            "issue": "Syntaxe OLD JOIN (Oracle 8i) - Non optimal",
-            "recommendation": "Réécrire avec JOIN explicite : FROM employees e JOIN departments d"
-        },
-        {
-            "query_id": "Q005",
-            "sql_text": "SELECT * FROM invoices WHERE invoice_date BETWEEN '2023-01-01' AND '2023-12-31'",
-            "execution_time_sec": 55.7,
-            "rows_processed": 2000000,
-            "buffer_gets": 320000,
-            "disk_reads": 15000,
-            "executions": 412,
-            "execution_plan": "INDEX RANGE SCAN | INVOICES_DATE_IDX | Cost: 6000",
-            "cost": 6000,
-            "issue": "Index existe mais sélectivité faible (trop de lignes retournées)",
-            "recommendation": "Partitionner table par année OU ajouter colonnes au SELECT"
-        },
-        {
-            "query_id": "Q006",
-            "sql_text": "SELECT DISTINCT customer_id FROM orders",
-            "execution_time_sec": 22.1,
-            "rows_processed": 1200000,
-            "buffer_gets": 210000,
-            "disk_reads": 9800,
-            "executions": 178,
-            "execution_plan": "SORT UNIQUE | Cost: 2500",
-            "cost": 2500,
-            "issue": "DISTINCT coûteux sur gros volume - Tri en mémoire",
-            "recommendation": "Utiliser GROUP BY customer_id (plus efficace avec index)"
-        },
-        {
-            "query_id": "Q007",
-            "sql_text": "SELECT * FROM transactions WHERE amount > (SELECT AVG(amount) FROM transactions)",
-            "execution_time_sec": 65.4,
-            "rows_processed": 3000000,
-            "buffer_gets": 450000,
-            "disk_reads": 18000,
-            "executions": 23,
-            "execution_plan": "SUBQUERY | TABLE ACCESS FULL | Cost: 8000",
-            "cost": 8000,
-            "issue": "Sous-requête scalaire exécutée pour chaque ligne",
-            "recommendation": "Utiliser WITH clause (CTE) pour calculer AVG une seule fois"
-        },
-        {
-            "query_id": "Q008",
-            "sql_text": "SELECT p.*, c.category_name FROM products p LEFT JOIN categories c ON p.category_id = c.id WHERE c.active = 1",
-            "execution_time_sec": 15.2,
-            "rows_processed": 250000,
-            "buffer_gets": 85000,
-            "disk_reads": 3500,
-            "executions": 145,
-            "execution_plan": "HASH JOIN OUTER | Cost: 1200",
-            "cost": 1200,
-            "issue": "Filtre WHERE sur table droite d'un LEFT JOIN - Convertit en INNER JOIN",
-            "recommendation": "Utiliser INNER JOIN directement OU déplacer filtre dans ON"
-        },
-        {
-            "query_id": "Q009",
-            "sql_text": "SELECT * FROM sales WHERE sales_date IN (SELECT date FROM calendar WHERE is_holiday = 1)",
-            "execution_time_sec": 38.9,
-            "rows_processed": 900000,
-            "buffer_gets": 165000,
-            "disk_reads": 7200,
-            "executions": 267,
-            "execution_plan": "NESTED LOOPS | SUBQUERY | Cost: 4000",
-            "cost": 4000,
-            "issue": "IN avec sous-requête - Exécution répétée de la sous-requête",
-            "recommendation": "Remplacer par JOIN : FROM sales s JOIN calendar c ON s.sales_date = c.date WHERE c.is_holiday = 1"
-        },
-        {
-            "query_id": "Q010",
-            "sql_text": "SELECT customer_id, SUM(amount) FROM orders GROUP BY customer_id HAVING SUM(amount) > 10000 ORDER BY SUM(amount) DESC",
-            "execution_time_sec": 42.6,
-            "rows_processed": 1800000,
-            "buffer_gets": 280000,
-            "disk_reads": 11000,
-            "executions": 98,
-            "execution_plan": "SORT GROUP BY | SORT ORDER BY | Cost: 4500",
-            "cost": 4500,
-            "issue": "Double tri (GROUP BY + ORDER BY) - Consommation mémoire élevée",
-            "recommendation": "Augmenter SORT_AREA_SIZE OU créer index sur (customer_id, amount)"
-        }
-    ]
+    if verbose:
+        print("🔄 Génération des requêtes lentes (simulation V$SQL)...")
     
-    df = pd.DataFrame(queries)
-    df.to_csv("data/slow_queries.csv", index=False)
+    df = _build_slow_queries_df().copy()
+    _write_if_stale(df, "data/slow_queries.csv", _content_key(_SLOW_QUERIES))
     
-    print(f"   ✅ {len(queries)} requêtes lentes générées avec plans d'exécution")
+    if verbose:
+        print(f"   ✅ {len(df)} requêtes lentes générées avec plans d'exécution")
     return df
 
 
-def generate_security_config():
+def generate_security_config(verbose=True):
     """
     Génère configuration de sécurité
     Simule : SELECT * FROM dba_users JOIN dba_role_privs JOIN dba_sys_privs
     """
     
-    print("🔄 Génération config sécurité (simulation DBA_USERS/ROLES/PRIVS)...")
-    
-    security_data = [
-        {
-            "username": "SYSTEM",
-            "account_status": "OPEN",
-            "profile": "DEFAULT",
-            "created_date": "2020-01-15",
-            "lock_date": None,
-            "expiry_date": "2026-01-15",
-            "roles": "DBA,CONNECT,RESOURCE",
-            "system_privileges": "CREATE SESSION,CREATE TABLE,DROP ANY TABLE,ALTER SYSTEM",
-            "password_life_days": 90,
-            "failed_login_attempts": 0,
-            "last_login": "2026-01-06 14:23:15",
-            "risk_level": "CRITICAL",
-            "risk_reasons": "Compte système avec DBA role - Privilèges excessifs"
-        },
-        {
-            "username": "SYS",
-            "account_status": "OPEN",
-            "profile": "DEFAULT",
-            "created_date": "2020-01-15",
-            "lock_date": None,
-            "expiry_date": "2026-06-15",
-            "roles": "DBA,SYSDBA,SYSOPER",
-            "system_privileges": "ALL PRIVILEGES",
-            "password_life_days": 180,
-            "failed_login_attempts": 0,
-            "last_login": "2026-01-05 09:12:34",
-            "risk_level": "CRITICAL",
-            "risk_reasons": "Compte ultra-privilégié - Ne devrait pas être utilisé directement"
-        },
-        {
-            "username": "ADMIN_USER",
-            "account_status": "OPEN",
-            "profile": "ADMIN_PROFILE",
-            "created_date": "2023-03-10",
-            "lock_date": None,
-            "expiry_date": "2026-03-10",
-            "roles": "DBA,CONNECT",
-            "system_privileges": "CREATE SESSION,CREATE USER,DROP USER,GRANT ANY PRIVILEGE",
-            "password_life_days": 60,
-            "failed_login_attempts": 2,
-            "last_login": "2026-01-07 08:45:22",
-            "risk_level": "HIGH",
-            "risk_reasons": "Peut créer/supprimer users - 2 tentatives login échouées récentes"
-        },
-        {
-            "username": "APP_USER",
-            "account_status": "OPEN",
-            "profile": "APP_PROFILE",
-            "created_date": "2023-06-20",
-            "lock_date": None,
-            "expiry_date": "2026-06-20",
-            "roles": "CONNECT,RESOURCE",
-            "system_privileges": "CREATE SESSION,CREATE TABLE,CREATE VIEW",
-            "password_life_days": 90,
-            "failed_login_attempts": 0,
-            "last_login": "2026-01-07 10:15:43",
-            "risk_level": "MEDIUM",
-            "risk_reasons": "Compte applicatif standard - Privilèges appropriés"
-        },
-        {
-            "username": "READ_ONLY",
-            "account_status": "OPEN",
-            "profile": "LIMITED_PROFILE",
-            "created_date": "2024-01-05",
-            "lock_date": None,
-            "expiry_date": "2026-01-05",
-            "roles": "CONNECT",
-            "system_privileges": "CREATE SESSION",
-            "password_life_days": 120,
-            "failed_login_attempts": 0,
-            "last_login": "2026-01-06 16:30:12",
-            "risk_level": "LOW",
-            "risk_reasons": "Compte lecture seule - Sécurisé"
-        },
-        {
-            "username": "EXTERNAL_USER",
-            "account_status": "OPEN",
-            "profile": "DEFAULT",
-            "created_date": "2025-11-20",
-            "lock_date": None,
-            "expiry_date": "2026-02-20",
-            "roles": "CONNECT,RESOURCE,DBA",
-            "system_privileges": "CREATE SESSION,DROP ANY TABLE,CREATE USER,ALTER SYSTEM",
-            "password_life_days": 30,
-            "failed_login_attempts": 5,
-            "last_login": "2025-12-28 23:45:10",
-            "risk_level": "CRITICAL",
-            "risk_reasons": "Compte externe avec DBA - 5 tentatives échouées - Expiration courte - Login suspect (hors heures)"
-        },
-        {
-            "username": "TEST_USER",
-            "account_status": "EXPIRED",
-            "profile": "DEFAULT",
-            "created_date": "2024-06-10",
-            "lock_date": "2025-12-10",
-            "expiry_date": "2025-12-10",
-            "roles": "CONNECT",
-            "system_privileges": "CREATE SESSION",
-            "password_life_days": 0,
-            "failed_login_attempts": 10,
-            "last_login": "2025-11-30 14:20:05",
-            "risk_level": "HIGH",
-            "risk_reasons": "Compte expiré non désactivé - 10 tentatives échouées - Doit être supprimé"
-        },
-        {
-            "username": "ANALYST",
-            "account_status": "OPEN",
-            "profile": "ANALYST_PROFILE",
-            "created_date": "2024-09-15",
-            "lock_date": None,
-            "expiry_date": "2026-09-15",
-            "roles": "CONNECT,SELECT_CATALOG_ROLE",
-            "system_privileges": "CREATE SESSION,SELECT ANY TABLE",
-            "password_life_days": 90,
-            "failed_login_attempts": 1,
-            "last_login": "2026-01-07 09:30:45",
-            "risk_level": "MEDIUM",
-            "risk_reasons": "SELECT ANY TABLE privilège large - 1 tentative échouée"
-        }
-    ]
+    if verbose:
+        print("🔄 Génération config sécurité (simulation DBA_USERS/ROLES/PRIVS)...")
     
-    df = pd.DataFrame(security_data)
-    df.to_csv("data/security_config.csv", index=False)
+    df = _build_security_config_df().copy()
+    key = _content_key(_SECURITY_CONFIG)
+    _write_if_stale(df, "data/security_config.parquet", key)
+    if CSV_COMPAT:
+        _write_if_stale(df, "data/security_config.csv", key)
     
-    print(f"   ✅ {len(security_data)} configurations sécurité générées")
+    if verbose:
+        print(f"   ✅ {len(df)} configurations sécurité générées")
     return df
 
 
-def generate_db_metrics():
+def generate_db_metrics(verbose=True):
     """
     Génère métriques de la base de données
     Simule : SELECT * FROM v$sysmetric, v$system_event, dba_data_files
     """
     
-    print("🔄 Génération métriques DB (simulation V$SYSMETRIC, V$SYSTEM_EVENT)...")
+    if verbose:
+        print("🔄 Génération métriques DB (simulation V$SYSMETRIC, V$SYSTEM_EVENT)...")
     
-    metrics = {
-        "database_name": "ORCL_PROD",
-        "instance_name": "ORCL",
-        "host_name": "db-server-01",
-        "db_version": "Oracle Database 19c Enterprise Edition Release 19.0.0.0.0",
-        "startup_time": (datetime.now() - timedelta(days=45)).strftime("%Y-%m-%d %H:%M:%S"),
-        "db_size_gb": 2500,
-        "tablespaces_count": 12,
-        "datafiles_count": 48,
-        "users_count": 45,
-        "tables_count": 850,
-        "indexes_count": 1200,
-        "views_count": 320,
-        "daily_transactions": 5000000,
-        "peak_connections": 250,
-        "current_connections": 187,
-        "avg_response_time_ms": 120,
-        "cpu_usage_percent": 65,
-        "memory_total_gb": 256,
-        "memory_usage_gb": 128,
-        "sga_size_gb": 64,
-        "pga_size_gb": 32,
-        "disk_io_read_mbps": 450,
-        "disk_io_write_mbps": 320,
-        "network_traffic_mbps": 180,
-        "buffer_cache_hit_ratio": 98.5,
-        "library_cache_hit_ratio": 99.2,
-        "backup_frequency": "DAILY",
-        "last_full_backup": (datetime.now() - timedelta(days=1)).strftime("%Y-%m-%d"),
-        "last_incremental_backup": datetime.now().strftime("%Y-%m-%d"),
-        "backup_size_gb": 1800,
-        "rto_hours": 4,
-        "rpo_hours": 1,
-        "archivelog_mode": "ENABLED",
-        "flashback_enabled": "YES",
-        "rac_enabled": "NO",
-        "dataguard_enabled": "YES",
-        "criticality": "HIGH",
-        "environment": "PRODUCTION",
-        "compliance_standards": "SOX,GDPR,PCI-DSS"
-    }
+    today = datetime.now().strftime("%Y-%m-%d")
+    df = _build_db_metrics_df(today).copy()
+    key = _content_key(df.iloc[0].to_dict())
+    _write_if_stale(df, "data/db_metrics.parquet", key)
+    if CSV_COMPAT:
+        _write_if_stale(df, "data/db_metrics.csv", key)
     
-    df = pd.DataFrame([metrics])
-    df.to_csv("data/db_metrics.csv", index=False)
-    
-    print("   ✅ Métriques DB générées (simulation instance production)")
+    if verbose:
+        print("   ✅ Métriques DB générées (simulation instance production)")
     return df
 
 
-def generate_prompts_yaml():
+def generate_prompts_yaml(verbose=True):
     """
     Génère le fichier prompts.yaml avec tous les prompts du projet
     """
     
-    print("🔄 Génération fichier prompts.yaml...")
+    if verbose:
+        print("🔄 Génération fichier prompts.yaml...")
     
     prompts = {
         "security_audit": {
@@ -596,15 +891,112 @@ Si la question concerne :
     }
     
     import yaml
-    with open("data/prompts.yaml", "w", encoding="utf-8") as f:
-        yaml.dump(prompts, f, default_flow_style=False, allow_unicode=True, sort_keys=False)
+    try:
+        from yaml import CSafeDumper as Dumper  # libyaml (C)
+    except ImportError:
+        from yaml import SafeDumper as Dumper
+    
+    # Sérialisation en mémoire puis une seule écriture
+    data = yaml.dump(prompts, Dumper=Dumper, default_flow_style=False, allow_unicode=True,
+                     sort_keys=False, encoding="utf-8")
+    with _atomic_write("data/prompts.yaml") as tmp_path:
+        Path(tmp_path).write_bytes(data)
     
-    print("   ✅ Fichier prompts.yaml créé avec 10+ prompts")
+    if verbose:
+        print("   ✅ Fichier prompts.yaml créé avec 10+ prompts")
     return prompts
 
 
-def generate_all_data():
-    """Génère tous les fichiers de données du projet"""
+# =========================================================
+# MANIFEST (évite de régénérer des sorties inchangées)
+# =========================================================
+MANIFEST_PATH = "data/.manifest"
+
+
+def _manifest_outputs():
+    """Fichiers produits par generate_all_data (et relus si le manifest est valide)"""
+    outputs = ["data/audit_logs.csv", "data/slow_queries.csv", "data/security_config.parquet",
+               "data/db_metrics.parquet", "data/prompts.yaml"]
+    if CSV_COMPAT:
+        outputs += ["data/security_config.csv", "data/db_metrics.csv"]
+    return outputs
+
+
+def _manifest_key(seed):
+    """Empreinte du code source + seed + date du jour (champs datés des métriques)"""
+    with open(__file__, "rb") as f:
+        source_hash = hashlib.blake2b(f.read(), digest_size=16).hexdigest()
+    today = datetime.now().strftime("%Y-%m-%d")
+    return hashlib.blake2b(f"{source_hash}|{seed}|{today}".encode("utf-8"), digest_size=16).hexdigest()
+
+
+def _manifest_is_fresh(key):
+    """Manifest identique et aucune sortie manquante ou réécrite depuis (ex: DataExtractor)"""
+    if not os.path.exists(MANIFEST_PATH):
+        return False
+    with open(MANIFEST_PATH, "r", encoding="utf-8") as f:
+        if f.read().strip() != key:
+            return False
+    manifest_mtime = os.path.getmtime(MANIFEST_PATH)
+    return all(
+        os.path.exists(path) and os.path.getmtime(path) <= manifest_mtime
+        for path in _manifest_outputs()
+    )
+
+
+def _write_manifest(key):
+    """Écriture atomique (fichier temporaire + os.replace)"""
+    with _atomic_write(MANIFEST_PATH) as tmp_path, open(tmp_path, "w", encoding="utf-8") as f:
+        f.write(key)
+
+
+def _load_cached_outputs():
+    """Relit les sorties d'une génération précédente"""
+    pd = _get_pd()
+    import yaml
+    try:
+        from yaml import CSafeLoader as Loader
+    except ImportError:
+        from yaml import SafeLoader as Loader
+    
+    return {
+        "audit_logs": _read_audit_logs("data/audit_logs.csv"),
+        "slow_queries": pd.read_csv("data/slow_queries.csv"),
+        "security_config": pd.read_parquet("data/security_config.parquet"),
+        "db_metrics": pd.read_parquet("data/db_metrics.parquet"),
+        "prompts": yaml.load(Path("data/prompts.yaml").read_bytes(), Loader=Loader)
+    }
+
+
+def invalidate():
+    """Force la prochaine génération complète (supprime le manifest)"""
+    if os.path.exists(MANIFEST_PATH):
+        os.remove(MANIFEST_PATH)
+
+
+def _summary_stats(df_audit, df_queries, df_security, df_metrics):
+    """Statistiques du résumé : un seul passage par colonne"""
+    # dropna=False : une sévérité manquante compte comme suspecte (total - normaux)
+    severity_counts = df_audit['severity'].value_counts(dropna=False)
+    risk_counts = df_security['risk_level'].value_counts(dropna=False)
+    n_normal = int(severity_counts.get('NORMAL', 0))
+    
+    return {
+        "normal_logs": n_normal,
+        "suspect_logs": int(severity_counts.sum()) - n_normal,
+        "total_executions": int(df_queries['executions'].sum()),
+        "critical_risks": int(risk_counts.get('CRITICAL', 0)),
+        "db_size_gb": df_metrics['db_size_gb'].iat[0]
+    }
+
+
+def generate_all_data(seed=42, force=False):
+    """
+    Génère tous les fichiers de données du projet
+    
+    Si le manifest correspond (même code, même seed, même jour), les fichiers
+    existants sont relus au lieu d'être régénérés ; force=True régénère tout.
+    """
     
     print("\n" + "="*70)
     print("🚀 MODULE 1 : GÉNÉRATION DES DONNÉES SYNTHÉTIQUES ORACLE")
@@ -614,29 +1006,48 @@ def generate_all_data():
     os.makedirs("data", exist_ok=True)
     os.makedirs("data/oracle_docs", exist_ok=True)
     
-    # Générer tous les fichiers
-    df_audit = generate_audit_logs()
-    df_queries = generate_slow_queries()
-    df_security = generate_security_config()
-    df_metrics = generate_db_metrics()
-    prompts = generate_prompts_yaml()
+    key = _manifest_key(seed)
+    if not force and _manifest_is_fresh(key):
+        print("♻️  Données inchangées (manifest valide) → relecture des fichiers existants")
+        results = _load_cached_outputs()
+    else:
+        # Générer tous les fichiers (générateurs indépendants -> en parallèle)
+        generators = {
+            "audit_logs": functools.partial(generate_audit_logs, seed=seed),
+            "slow_queries": generate_slow_queries,
+            "security_config": generate_security_config,
+            "db_metrics": generate_db_metrics,
+            "prompts": generate_prompts_yaml
+        }
+        print(f"🔄 Génération en parallèle ({len(generators)} générateurs)...")
+        with ThreadPoolExecutor(max_workers=len(generators)) as executor:
+            futures = {name: executor.submit(fn, verbose=False) for name, fn in generators.items()}
+            results = {name: future.result() for name, future in futures.items()}
+        _write_manifest(key)
+    
+    df_audit = results["audit_logs"]
+    df_queries = results["slow_queries"]
+    df_security = results["security_config"]
+    df_metrics = results["db_metrics"]
+    prompts = results["prompts"]
     
     print("\n" + "="*70)
     print("✅ MODULE 1 TERMINÉ !")
     print("="*70)
     print("\n📁 Fichiers créés dans 'data/' :")
-    print(f"   ✅ audit_logs.csv          - {len(df_audit)} logs (50 normaux + 20 suspects)")
+    stats = _summary_stats(df_audit, df_queries, df_security, df_metrics)
+    print(f"   ✅ audit_logs.csv          - {len(df_audit)} logs ({stats['normal_logs']} normaux + {stats['suspect_logs']} suspects)")
     print(f"   ✅ slow_queries.csv        - {len(df_queries)} requêtes lentes avec plans")
     print(f"   ✅ security_config.csv     - {len(df_security)} configurations utilisateurs")
     print(f"   ✅ db_metrics.csv          - Métriques instance Oracle")
     print(f"   ✅ prompts.yaml            - 10+ prompts pour LLM")
     
     print("\n📊 Statistiques :")
-    print(f"   • Logs normaux : {len(df_audit[df_audit['severity'] == 'NORMAL'])}")
-    print(f"   • Logs suspects : {len(df_audit[df_audit['severity'] != 'NORMAL'])}")
-    print(f"   • Requêtes analysées : {df_queries['executions'].sum()} exécutions totales")
-    print(f"   • Risques sécurité CRITICAL : {len(df_security[df_security['risk_level'] == 'CRITICAL'])}")
-    print(f"   • Taille DB simulée : {df_metrics['db_size_gb'].values[0]} GB")
+    print(f"   • Logs normaux : {stats['normal_logs']}")
+    print(f"   • Logs suspects : {stats['suspect_logs']}")
+    print(f"   • Requêtes analysées : {stats['total_executions']} exécutions totales")
+    print(f"   • Risques sécurité CRITICAL : {stats['critical_risks']}")
+    print(f"   • Taille DB simulée : {stats['db_size_gb']} GB")
     
     print("\n🎯 Prochaine étape : MODULE 2 (RAG Setup avec Pinecone)")
     print("="*70 + "\n")
@@ -6,22 +6,249 @@ Handles prompt engineering, error handling, and different types of analysis.
 """
 
 import os
-import yaml
+import re
+import sys
+import copy
 import time
-from typing import Dict, Any, Optional, List
-from groq import Groq
+import asyncio
+import hashlib
+import string
+import tempfile
+import threading
+import functools
+from concurrent.futures import Future, ThreadPoolExecutor
+from types import SimpleNamespace
+from collections import OrderedDict
+from typing import TYPE_CHECKING, Dict, Any, Optional, List, Callable, Tuple, Iterator
+
+import httpx
+from groq import Groq, AsyncGroq, APIConnectionError, RateLimitError, InternalServerError
 from dotenv import load_dotenv
 
+# yaml and numpy are imported where used: yaml only when the JSON prompts
+# sidecar is stale, numpy only for the semantic cache (embed_fn set)
+if TYPE_CHECKING:
+    import numpy as np
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+    import json
+
+try:
+    import xxhash  # SIMD xxh3 for cache keys
+except ImportError:
+    xxhash = None
+
 # Load environment variables
 load_dotenv()
 
+def _hash_text(text: str) -> str:
+    """128-bit hex digest used for response cache keys (xxh3 when available, else blake2b)."""
+    data = text.encode('utf-8')
+    if xxhash is not None:
+        return xxhash.xxh3_128_hexdigest(data)
+    return hashlib.blake2b(data, digest_size=16).hexdigest()
+
+
+@functools.lru_cache(maxsize=64)
+def _scope_digest(model: str, temperature: float, max_tokens: int, system_prompt: str) -> str:
+    """Digest of the cache scope; the system prompt is hashed once, not per call."""
+    return _hash_text(f"{model}|{temperature}|{max_tokens}|{system_prompt}")
+
+
+# Transient API failures worth retrying (connection/timeout, 429, 5xx); any
+# other error (bad request, auth, malformed response) fails on first attempt
+_RETRYABLE_ERRORS = (APIConnectionError, RateLimitError, InternalServerError)
+
+# Chat messages as sent to the API: (system, user)
+_Messages = Tuple[Dict[str, str], ...]
+
+# Intent categories, matched in a single regex scan
+_VALID_CATS = (
+    "DATABASE_QUERY",
+    "QUERY_OPTIMIZATION",
+    "SECURITY_AUDIT",
+    "ANOMALY_DETECTION",
+    "BACKUP_STRATEGY",
+    "RECOVERY_GUIDE",
+    "GENERAL_HELP"
+)
+_CAT_RE = re.compile("|".join(_VALID_CATS))
+_CAT_MAX_LEN = max(map(len, _VALID_CATS))
+_PUNCT_STRIP = str.maketrans("", "", "*`'\".,:;!?()[]")
+
+# Combined plan analysis: one call, three sections parsed client-side
+_COMBO_SECTIONS = ("EXPLAIN", "COSTLY", "SUGGEST")
+_COMBO_SPLIT_RE = re.compile(r'^[ \t#*]*(EXPLAIN|COSTLY|SUGGEST)[ \t*:]*$', re.M)
+_COMBO_PROMPT = """Analyze this Oracle query and its execution plan.
+Query: {sql_query}
+Plan: {plan_data}
+
+Answer in exactly three sections, each starting with its header on its own line:
+## EXPLAIN
+Explain the execution plan in simple terms: what does it tell us about query performance?
+## COSTLY
+Identify the 3 most costly operations; for each, explain why it's expensive and suggest improvements.
+## SUGGEST
+Suggest 2-3 specific optimizations (index, hint, rewrite) with expected impact.
+"""
+
+# Anomaly verdict early stop: a risk level word followed by two complete
+# justification sentences is all the detector keeps from a free-text answer
+_RE_CLASSIFICATION = re.compile(r'\b(normal|suspect|suspicious|critique|critical)\b', re.I)
+_RE_JUSTIF = re.compile(r'[.!?](?:\s|$)')
+
+
+def _anomaly_verdict_complete(text: str) -> bool:
+    """True once a free-text anomaly answer holds a verdict and its justification."""
+    if text.lstrip().startswith(('{', '`')):
+        return False  # JSON answers must be read to the end
+    match = _RE_CLASSIFICATION.search(text)
+    if not match:
+        return False
+    return len(_RE_JUSTIF.findall(text, match.end())) >= 2
+
+
+# Prompt templates resolved once at init: attribute -> (section, key)
+_TEMPLATE_KEYS = {
+    "explain_plan": ("query_optimization", "explain_plan"),
+    "identify_costly": ("query_optimization", "identify_costly_operations"),
+    "suggest": ("query_optimization", "suggest_optimizations"),
+    "combo": ("query_optimization", "combined_analysis"),
+    "security": ("security_audit", "analyze_users_roles"),
+    "anomaly": ("anomaly_detection", "analyze_log_entry"),
+    "intent": ("intent_classification", "classify_intent")
+}
+
+_FORMATTER = string.Formatter()
+
+
+@functools.lru_cache(maxsize=64)
+def _compile_template(template: str) -> Callable[[Dict[str, Any]], str]:
+    """
+    Compile a str.format template into a renderer taking a mapping.
+
+    The template is parsed once into (literal, field name) parts instead of on
+    every format_map call; rendering only looks up and joins them. Positional,
+    attribute/index, conversion or format-spec fields are left to format_map.
+    """
+    parts = []
+    for literal, name, spec, conversion in _FORMATTER.parse(template):
+        if literal:
+            parts.append((literal, None))
+        if name is None:
+            continue
+        if not name or not name.isidentifier() or spec or conversion:
+            return template.format_map
+        parts.append(('', name))
+    parts = tuple(parts)
+
+    def render(mapping: Dict[str, Any]) -> str:
+        return "".join(literal if name is None else format(mapping[name]) for literal, name in parts)
+
+    return render
+
+
+# Connection pool shared by every LLMEngine: keep-alive TCP/TLS connections
+# are reused across instances, calls and retries. Idle connections are kept
+# 5 min (httpx default: 5 s) so interactive use does not re-handshake TLS.
+_HTTP_LIMITS = httpx.Limits(max_connections=100, max_keepalive_connections=20, keepalive_expiry=300.0)
+_HTTP_TIMEOUT = 30.0
+_http_client: Optional[httpx.Client] = None
+_http_client_lock = threading.Lock()
+
+
+def _get_http_client() -> httpx.Client:
+    """Process-wide pooled HTTP client for the sync Groq clients."""
+    global _http_client
+    with _http_client_lock:
+        if _http_client is None:
+            _http_client = httpx.Client(limits=_HTTP_LIMITS, timeout=_HTTP_TIMEOUT)
+        return _http_client
+
+
+class _AsyncTokenBucket:
+    """
+    Async token-bucket rate limiter: at most `rate` acquisitions per `period`
+    seconds, with bursts up to `rate`. Waiting tasks sleep on the event loop,
+    so they never block other in-flight requests.
+    """
+
+    def __init__(self, rate: float, period: float = 60.0):
+        self.rate = rate
+        self.period = period
+        self._tokens = float(rate)
+        self._last = time.monotonic()
+
+    async def acquire(self):
+        # No await between refill and take: safe without a lock on one event loop
+        while True:
+            now = time.monotonic()
+            self._tokens = min(self.rate, self._tokens + (now - self._last) * self.rate / self.period)
+            self._last = now
+            if self._tokens >= 1:
+                self._tokens -= 1
+                return
+            await asyncio.sleep((1 - self._tokens) * self.period / self.rate)
+
+
+# Parsed prompt files shared across LLMEngine instances:
+# abspath -> (mtime, size, prompts), invalidated when the file changes
+_PROMPTS_CACHE: "OrderedDict[str, Tuple[float, int, Dict[str, Any]]]" = OrderedDict()
+_PROMPTS_CACHE_SIZE = 32
+_PROMPTS_CACHE_LOCK = threading.Lock()
+
+
+def _parse_prompts_file(path: str) -> Dict[str, Any]:
+    """
+    Parse a prompts YAML file, going through a JSON sidecar (<path>.json).
+
+    The sidecar is used when it is at least as recent as the YAML; otherwise
+    the YAML is parsed with the C loader and the sidecar is (re)written.
+    """
+    sidecar = f"{path}.json"
+    if os.path.exists(sidecar) and os.path.getmtime(sidecar) >= os.path.getmtime(path):
+        try:
+            with open(sidecar, 'rb') as f:
+                data = f.read()
+            return orjson.loads(data) if orjson else json.loads(data.decode('utf-8'))
+        except Exception:
+            pass  # Corrupted sidecar: fall back to the YAML
+
+    import yaml
+    try:
+        from yaml import CSafeLoader as SafeLoader  # libyaml (C)
+    except ImportError:
+        from yaml import SafeLoader
+
+    with open(path, 'r', encoding='utf-8') as f:
+        prompts = yaml.load(f, Loader=SafeLoader)
+
+    try:
+        data = orjson.dumps(prompts) if orjson else json.dumps(prompts, ensure_ascii=False).encode('utf-8')
+        tmp_path = f"{sidecar}.tmp"
+        with open(tmp_path, 'wb') as f:
+            f.write(data)
+        os.replace(tmp_path, sidecar)
+    except Exception as e:
+        print(f"Could not write prompts cache {sidecar}: {e}")
+
+    return prompts
+
 class LLMEngine:
     """
     Centralized LLM engine for Oracle AI Platform using Groq API.
     """
 
+    # Precomputed indentation for plan formatting
+    _INDENTS = tuple("  " * i for i in range(64))
+
     def __init__(self, api_key: str = None, model: str = "meta-llama/llama-4-scout-17b-16e-instruct",
-                 prompts_file: str = "data/prompts.yaml"):
+                 prompts_file: str = "data/prompts.yaml",
+                 embed_fn: Optional[Callable[[str], List[float]]] = None,
+                 cache_path: Optional[str] = None):
         """
         Initialize LLM Engine.
 
@@ -29,25 +256,86 @@ class LLMEngine:
             api_key: Groq API key
             model: Groq model to use
             prompts_file: Path to prompts YAML file
+            embed_fn: Optional text embedder enabling the semantic response cache
+                      for call sites that opt in (generate(..., semantic_cache=True))
+                      (e.g. lambda t: rag.embedding_model.encode([t])[0])
+            cache_path: Optional JSON Lines file keeping exact-match cache
+                        entries across runs (responses only, no embeddings)
         """
         self.api_key = api_key or os.getenv("GROQ_API_KEY")
         if not self.api_key:
             raise ValueError("GROQ_API_KEY environment variable not set")
 
         self.model = model
-        self.client = Groq(api_key=self.api_key)
+        self.client = Groq(api_key=self.api_key, http_client=_get_http_client())
+        # Async pool is bound to one event loop: batch() always runs on self._loop
+        self.aclient = AsyncGroq(
+            api_key=self.api_key,
+            http_client=httpx.AsyncClient(limits=_HTTP_LIMITS, timeout=_HTTP_TIMEOUT)
+        )
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._loop_lock = threading.Lock()
+        # Worker threads for submit_* (created on first use)
+        self._pool: Optional[ThreadPoolExecutor] = None
+        self._pool_lock = threading.Lock()
 
         # Load prompts
         self.prompts = self._load_prompts(prompts_file)
 
+        # System message built once: byte-identical prefix on every call, so
+        # provider-side prompt (prefix) caching can reuse it
+        system_prompt = self.prompts.get('general', {}).get('system_prompt', '')
+        self._system_message = {"role": "system", "content": sys.intern(system_prompt)}
+
+        # Templates looked up once (prompts are immutable after load); '' if missing
+        self.T = SimpleNamespace(**{
+            name: self.prompts.get(section, {}).get(key, '')
+            for name, (section, key) in _TEMPLATE_KEYS.items()
+        })
+        self.T.combo = self.T.combo or _COMBO_PROMPT
+
         # Error handling settings
         self.max_retries = 3
         self.retry_delay = 1  # seconds
 
+        # Max concurrent requests for batched calls (Groq rate limits)
+        self.max_concurrency = 4
+        # Request rate for async calls (retries included)
+        self.requests_per_minute = 500
+        self._limiter = _AsyncTokenBucket(self.requests_per_minute, 60.0)
+
+        # Prompt size caps (~1500 tokens of plan text)
+        self.max_prompt_chars = 6000
+        self.max_plan_steps = 50       # costliest steps kept for flat plans
+        self.max_config_entries = 30   # per users/roles/privileges section
+        self.max_log_chars = 500
+        self.ascii_only_plans = True   # strip non-ASCII from plan text
+
+        # Response cache: exact match (LRU) + semantic match when embed_fn is set
+        # and the call site opts in (generate(..., semantic_cache=True) only).
+        # Only low-temperature calls are cached.
+        self.cache_size = 512
+        self.cache_max_temperature = 0.2
+        self.semantic_threshold = 0.95
+        self.embed_fn = embed_fn
+        self._cache: "OrderedDict[str, str]" = OrderedDict()
+        # (scope, template id, unit vector of the user-supplied text, cache key)
+        self._semantic_entries: List[Tuple[str, str, 'np.ndarray', str]] = []
+        self._cache_lock = threading.Lock()
+        # Persistent backend: one line appended per store, file compacted
+        # (rewritten from the LRU) once it holds twice cache_size lines
+        self.cache_path = cache_path
+        self._persisted_lines = 0
+        if cache_path:
+            self._load_persistent_cache()
+
     def _load_prompts(self, prompts_file: str) -> Dict[str, Any]:
         """
         Load prompts from YAML file.
 
+        The parsed result is cached per file (keyed by absolute path and
+        validated by mtime + size); each instance gets its own deep copy.
+
         Args:
             prompts_file: Path to prompts file
 
@@ -55,13 +343,29 @@ class LLMEngine:
             Dictionary of prompts
         """
         try:
-            with open(prompts_file, 'r', encoding='utf-8') as f:
-                return yaml.safe_load(f)
+            key = os.path.abspath(prompts_file)
+            st = os.stat(key)
+            with _PROMPTS_CACHE_LOCK:
+                hit = _PROMPTS_CACHE.get(key)
+                if hit and hit[0] == st.st_mtime and hit[1] == st.st_size:
+                    _PROMPTS_CACHE.move_to_end(key)
+                    return copy.deepcopy(hit[2])
+
+            prompts = _parse_prompts_file(key)
+
+            with _PROMPTS_CACHE_LOCK:
+                _PROMPTS_CACHE[key] = (st.st_mtime, st.st_size, prompts)
+                _PROMPTS_CACHE.move_to_end(key)
+                while len(_PROMPTS_CACHE) > _PROMPTS_CACHE_SIZE:
+                    _PROMPTS_CACHE.popitem(last=False)
+            return copy.deepcopy(prompts)
         except Exception as e:
             print(f"Error loading prompts file: {e}")
             return {}
 
-    def _call_llm(self, prompt: str, context: str = None, temperature: float = 0.1) -> str:
+    def _call_llm(self, prompt: str, context: str = None, temperature: float = 0.1,
+                  max_tokens: int = 2048, model: str = None,
+                  semantic_key: Optional[Tuple[str, str]] = None) -> str:
         """
         Make LLM API call with retry logic.
 
@@ -69,40 +373,401 @@ class LLMEngine:
             prompt: The prompt to send
             context: Optional context for RAG
             temperature: Creativity parameter
+            max_tokens: Maximum response length
+            model: Per-call model override (defaults to self.model)
+            semantic_key: (template id, user-supplied text) enabling the
+                          semantic cache tier for this call (see _cache_lookup)
 
         Returns:
             LLM response text
         """
-        full_prompt = prompt
-        if context:
-            full_prompt = f"Context:\n{context}\n\n{prompt}"
-
-        messages = [
-            {"role": "system", "content": self.prompts.get('general', {}).get('system_prompt', '')},
-            {"role": "user", "content": full_prompt}
-        ]
+        model = model or self.model
+        messages = self._build_messages(prompt, context)
+        cached, vector = self._cache_lookup(messages, temperature, model, max_tokens, semantic_key)
+        if cached is not None:
+            return cached
 
         for attempt in range(self.max_retries):
             try:
                 response = self.client.chat.completions.create(
-                    model=self.model,
+                    model=model,
                     messages=messages,
                     temperature=temperature,
-                    max_tokens=2048,
+                    max_tokens=max_tokens,
                     top_p=1,
                     stream=False
                 )
 
-                return response.choices[0].message.content.strip()
+                result = response.choices[0].message.content.strip()
+                self._cache_store(messages, temperature, result, vector, model, max_tokens, semantic_key)
+                return result
 
-            except Exception as e:
+            except _RETRYABLE_ERRORS as e:
                 print(f"LLM call attempt {attempt + 1} failed: {e}")
                 if attempt < self.max_retries - 1:
                     time.sleep(self.retry_delay * (2 ** attempt))  # Exponential backoff
                 else:
                     return f"Error: Failed to get LLM response after {self.max_retries} attempts"
+            except Exception as e:
+                print(f"LLM call failed (not retried): {e}")
+                return f"Error: LLM call failed: {e}"
+
+    def _call_llm_stream(self, prompt: str, context: str = None, temperature: float = 0.1,
+                         model: str = None, max_tokens: int = 2048) -> Iterator[str]:
+        """
+        Stream the LLM response token by token (no retry, no cache).
+
+        Closing the generator early (break / close()) also closes the HTTP
+        stream, so the model stops generating the remaining tokens.
+
+        Args:
+            prompt: The prompt to send
+            context: Optional context for RAG
+            temperature: Creativity parameter
+            model: Per-call model override (defaults to self.model)
+            max_tokens: Maximum response length
+
+        Yields:
+            Response text fragments
+        """
+        stream = self.client.chat.completions.create(
+            model=model or self.model,
+            messages=self._build_messages(prompt, context),
+            temperature=temperature,
+            max_tokens=max_tokens,
+            top_p=1,
+            stream=True
+        )
+        try:
+            for chunk in stream:
+                if chunk.choices:
+                    yield chunk.choices[0].delta.content or ""
+        finally:
+            stream.close()
+
+    def _call_llm_until(self, prompt: str, context: str = None,
+                        stop: Callable[[str], bool] = None, temperature: float = 0.1,
+                        max_tokens: int = 2048) -> str:
+        """
+        Stream the response and stop generating as soon as it is good enough.
+
+        A complete answer (stop never hit) is cached like a regular call; a
+        cut-short one is not, so other callers never get a truncated answer.
+        Falls back to a regular call (with retries) if streaming fails.
+
+        Args:
+            prompt: The prompt to send
+            context: Optional context for RAG
+            stop: Predicate on the accumulated text; True closes the stream
+            temperature: Creativity parameter
+            max_tokens: Maximum response length
+
+        Returns:
+            LLM response text
+        """
+        messages = self._build_messages(prompt, context)
+        cached, vector = self._cache_lookup(messages, temperature, self.model, max_tokens)
+        if cached is not None:
+            return cached
+
+        buffer = ""
+        try:
+            for fragment in self._call_llm_stream(prompt, context, temperature, max_tokens=max_tokens):
+                buffer += fragment
+                if stop and stop(buffer):
+                    return buffer.strip()
+        except Exception as e:
+            print(f"LLM stream failed: {e}")
+            return self._call_llm(prompt, context, temperature, max_tokens)
+
+        result = buffer.strip()
+        self._cache_store(messages, temperature, result, vector, self.model, max_tokens)
+        return result
+
+    def _build_messages(self, prompt: str, context: str = None) -> _Messages:
+        """
+        Build chat messages (system prompt + user prompt with optional context).
+
+        The system message is the shared stable prefix (never mutated); only
+        the user message is built per call, so concurrent calls share nothing
+        mutable.
+
+        Args:
+            prompt: The prompt to send
+            context: Optional context for RAG
+
+        Returns:
+            Tuple of chat messages
+        """
+        user_message = {"role": "user", "content": f"Context:\n{context}\n\n{prompt}" if context else prompt}
+        return (self._system_message, user_message)
+
+    def _cache_scope(self, messages: _Messages, temperature: float, model: str, max_tokens: int) -> str:
+        """
+        Model + temperature + max_tokens + system prompt: entries only match
+        within the same scope (a short max_tokens answer may be truncated).
+        """
+        return _scope_digest(model, temperature, max_tokens, messages[0]['content'])
+
+    def _cache_lookup(self, messages: _Messages, temperature: float, model: str, max_tokens: int,
+                      semantic_key: Optional[Tuple[str, str]] = None
+                      ) -> Tuple[Optional[str], Optional['np.ndarray']]:
+        """
+        Look up a cached response (exact match first, then semantic).
+
+        The semantic tier is opt-in per call site: it only runs when
+        semantic_key = (template id, user-supplied text) is given and
+        embed_fn is set. Only that text is embedded (never the rendered
+        template, whose fixed part dominates the embedding), and entries
+        only match within the same scope and template id.
+
+        Returns:
+            (cached response or None, prompt embedding to reuse on store)
+        """
+        if temperature > self.cache_max_temperature:
+            return None, None
+
+        scope = self._cache_scope(messages, temperature, model, max_tokens)
+        key = _hash_text(f"{scope}|{messages[-1]['content']}")
+        with self._cache_lock:
+            hit = self._cache.get(key)
+            if hit is not None:
+                self._cache.move_to_end(key)
+                return hit, None
+
+        if self.embed_fn is None or semantic_key is None:
+            return None, None
+
+        import numpy as np
+        template_id, payload = semantic_key
+        vector = np.asarray(self.embed_fn(payload), dtype=np.float32)
+        vector = vector / (np.linalg.norm(vector) or 1.0)
+        with self._cache_lock:
+            candidates = [
+                (vec, k) for s, t, vec, k in self._semantic_entries
+                if s == scope and t == template_id and k in self._cache
+            ]
+            if candidates:
+                scores = np.stack([vec for vec, _ in candidates]) @ vector
+                best = int(np.argmax(scores))
+                if scores[best] >= self.semantic_threshold:
+                    best_key = candidates[best][1]
+                    self._cache.move_to_end(best_key)
+                    return self._cache[best_key], vector
+
+        return None, vector
+
+    def _cache_store(self, messages: _Messages, temperature: float,
+                     response: str, vector: Optional['np.ndarray'], model: str, max_tokens: int,
+                     semantic_key: Optional[Tuple[str, str]] = None):
+        """Store a successful low-temperature response (semantic entry only if semantic_key was used)."""
+        if temperature > self.cache_max_temperature or response.startswith("Error:"):
+            return
+
+        scope = self._cache_scope(messages, temperature, model, max_tokens)
+        key = _hash_text(f"{scope}|{messages[-1]['content']}")
+        with self._cache_lock:
+            self._cache[key] = response
+            self._cache.move_to_end(key)
+            while len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+            if vector is not None and semantic_key is not None:
+                self._semantic_entries.append((scope, semantic_key[0], vector, key))
+                if len(self._semantic_entries) > self.cache_size:
+                    self._semantic_entries = self._semantic_entries[-self.cache_size:]
+            if self.cache_path:
+                self._persist_entry(key, response)
+
+    def clear_cache(self):
+        """Drop all cached responses (and the persistent file's entries)."""
+        with self._cache_lock:
+            self._cache.clear()
+            self._semantic_entries = []
+            if self.cache_path:
+                self._compact_persistent_cache()
+
+    @staticmethod
+    def _dump_cache_line(key: str, response: str) -> bytes:
+        """One JSON Lines record of the persistent cache."""
+        entry = {"key": key, "response": response}
+        if orjson:
+            return orjson.dumps(entry) + b"\n"
+        return (json.dumps(entry, ensure_ascii=False) + "\n").encode('utf-8')
+
+    def _load_persistent_cache(self):
+        """Fill the exact-match LRU from cache_path; unreadable lines are skipped."""
+        if not os.path.exists(self.cache_path):
+            return
+        try:
+            with open(self.cache_path, 'rb') as f:
+                for line in f:
+                    try:
+                        entry = orjson.loads(line) if orjson else json.loads(line.decode('utf-8'))
+                        key, response = entry['key'], entry['response']
+                    except Exception:
+                        continue  # Truncated last line after a crash, etc.
+                    self._persisted_lines += 1
+                    self._cache[key] = response
+                    self._cache.move_to_end(key)
+                    if len(self._cache) > self.cache_size:
+                        self._cache.popitem(last=False)
+        except OSError as e:
+            print(f"Could not read response cache {self.cache_path}: {e}")
+
+    def _persist_entry(self, key: str, response: str):
+        """Append one entry to cache_path (caller holds the cache lock)."""
+        try:
+            if self._persisted_lines >= 2 * self.cache_size:
+                self._compact_persistent_cache()
+                return
+            os.makedirs(os.path.dirname(self.cache_path) or '.', exist_ok=True)
+            with open(self.cache_path, 'ab') as f:
+                f.write(self._dump_cache_line(key, response))
+            self._persisted_lines += 1
+        except OSError as e:
+            print(f"Could not write response cache {self.cache_path}: {e}")
+
+    def _compact_persistent_cache(self):
+        """Rewrite cache_path from the in-memory LRU, atomically (caller holds the cache lock)."""
+        directory = os.path.dirname(self.cache_path) or '.'
+        try:
+            os.makedirs(directory, exist_ok=True)
+            fd, tmp_path = tempfile.mkstemp(dir=directory, prefix=".llm_cache-", suffix=".tmp")
+            try:
+                with os.fdopen(fd, 'wb') as f:
+                    f.write(b"".join(self._dump_cache_line(k, r) for k, r in self._cache.items()))
+                os.replace(tmp_path, self.cache_path)
+            except BaseException:
+                os.unlink(tmp_path)
+                raise
+            self._persisted_lines = len(self._cache)
+        except OSError as e:
+            print(f"Could not write response cache {self.cache_path}: {e}")
+
+    async def _acall_llm(self, prompt: str, context: str = None, temperature: float = 0.1,
+                         model: str = None, max_tokens: int = 2048) -> str:
+        """
+        Async LLM API call with retry logic (same behaviour as _call_llm).
+
+        Args:
+            prompt: The prompt to send
+            context: Optional context for RAG
+            temperature: Creativity parameter
+            model: Per-call model override (defaults to self.model)
+            max_tokens: Maximum response length
+
+        Returns:
+            LLM response text
+        """
+        model = model or self.model
+        messages = self._build_messages(prompt, context)
+        cached, vector = self._cache_lookup(messages, temperature, model, max_tokens)
+        if cached is not None:
+            return cached
+
+        for attempt in range(self.max_retries):
+            try:
+                await self._limiter.acquire()
+                response = await self.aclient.chat.completions.create(
+                    model=model,
+                    messages=messages,
+                    temperature=temperature,
+                    max_tokens=max_tokens,
+                    top_p=1,
+                    stream=False
+                )
+
+                result = response.choices[0].message.content.strip()
+                self._cache_store(messages, temperature, result, vector, model, max_tokens)
+                return result
+
+            except _RETRYABLE_ERRORS as e:
+                print(f"LLM call attempt {attempt + 1} failed: {e}")
+                if attempt < self.max_retries - 1:
+                    await asyncio.sleep(self.retry_delay * (2 ** attempt))  # Exponential backoff
+                else:
+                    return f"Error: Failed to get LLM response after {self.max_retries} attempts"
+            except Exception as e:
+                print(f"LLM call failed (not retried): {e}")
+                return f"Error: LLM call failed: {e}"
 
-    def generate(self, prompt: str, context: str = None, model: str = None) -> str:
+    async def abatch(self, prompts: List[str], contexts: List[str] = None,
+                     temperature: float = 0.1, max_tokens: int = 2048) -> List[str]:
+        """
+        Run several prompts concurrently (at most max_concurrency in flight).
+
+        Args:
+            prompts: Prompt texts
+            contexts: Optional contexts, one per prompt
+            temperature: Creativity parameter
+            max_tokens: Maximum response length (per prompt)
+
+        Returns:
+            Responses in the same order as prompts
+        """
+        contexts = contexts or [None] * len(prompts)
+        semaphore = asyncio.Semaphore(self.max_concurrency)
+
+        async def call(prompt: str, context: str) -> str:
+            async with semaphore:
+                return await self._acall_llm(prompt, context, temperature, max_tokens=max_tokens)
+
+        return await asyncio.gather(*[call(p, c) for p, c in zip(prompts, contexts)])
+
+    def batch(self, prompts: List[str], contexts: List[str] = None, temperature: float = 0.1,
+              max_tokens: int = 2048) -> List[str]:
+        """
+        Synchronous wrapper around abatch (runs on the engine's own event loop).
+
+        Args:
+            prompts: Prompt texts
+            contexts: Optional contexts, one per prompt
+            temperature: Creativity parameter
+            max_tokens: Maximum response length (per prompt)
+
+        Returns:
+            Responses in the same order as prompts
+        """
+        # Same event loop every time, so pooled async connections stay usable
+        with self._loop_lock:
+            if self._loop is None or self._loop.is_closed():
+                self._loop = asyncio.new_event_loop()
+            return self._loop.run_until_complete(self.abatch(prompts, contexts, temperature, max_tokens))
+
+    def submit(self, fn: Callable[..., Any], *args, **kwargs) -> Future:
+        """
+        Run a blocking engine call on the engine's worker pool.
+
+        Lets callers fan out independent calls (e.g. one per log entry) without
+        an event loop; the HTTP wait releases the GIL, so threads suffice.
+
+        Args:
+            fn: Engine method to run (e.g. self.detect_anomaly)
+            *args, **kwargs: Arguments for fn
+
+        Returns:
+            Future holding fn's result
+        """
+        with self._pool_lock:
+            if self._pool is None:
+                self._pool = ThreadPoolExecutor(max_workers=self.max_concurrency,
+                                                thread_name_prefix="llm-engine")
+            return self._pool.submit(fn, *args, **kwargs)
+
+    def submit_analyze_query(self, sql_query: str, plan: Dict[str, Any]) -> Future:
+        """Non-blocking analyze_query (see submit)."""
+        return self.submit(self.analyze_query, sql_query, plan)
+
+    def submit_assess_security(self, config: Dict[str, Any]) -> Future:
+        """Non-blocking assess_security (see submit)."""
+        return self.submit(self.assess_security, config)
+
+    def submit_detect_anomaly(self, log_entry: Dict[str, Any], context: str = None) -> Future:
+        """Non-blocking detect_anomaly (see submit)."""
+        return self.submit(self.detect_anomaly, log_entry, context)
+
+    def generate(self, prompt: str, context: str = None, model: str = None,
+                 max_tokens: int = 2048, semantic_cache: bool = False) -> str:
         """
         General LLM generation method.
 
@@ -110,19 +775,18 @@ class LLMEngine:
             prompt: The prompt text
             context: Optional context
             model: Override default model
+            max_tokens: Maximum response length (short answers decode faster)
+            semantic_cache: Reuse the answer to a near-identical prompt (free-text
+                            chat only; needs embed_fn). The context must match exactly.
 
         Returns:
             Generated response
         """
-        if model:
-            # Temporarily change model
-            original_model = self.model
-            self.model = model
-            result = self._call_llm(prompt, context)
-            self.model = original_model
-            return result
-        else:
-            return self._call_llm(prompt, context)
+        semantic_key = None
+        if semantic_cache:
+            semantic_key = (f"generate|{_hash_text(context or '')}", prompt)
+        return self._call_llm(prompt, context, max_tokens=max_tokens, model=model,
+                              semantic_key=semantic_key)
 
     def analyze_query(self, sql_query: str, plan: Dict[str, Any]) -> str:
         """
@@ -135,16 +799,30 @@ class LLMEngine:
         Returns:
             Analysis and optimization suggestions
         """
-        prompt_template = self.prompts.get('query_optimization', {}).get('explain_plan', '')
-        if not prompt_template:
+        # Same prompt as explain_plan: delegate so both share one request/cache entry
+        if not self.T.explain_plan:
             return "Error: Query optimization prompt not found"
 
-        # Format plan for prompt
-        plan_text = self._format_execution_plan(plan)
+        return self.explain_plan(plan)
+
+    def analyze_many(self, plans: List[Dict[str, Any]]) -> List[str]:
+        """
+        Analyze several execution plans concurrently.
 
-        prompt = prompt_template.format(plan_data=plan_text)
+        Args:
+            plans: Execution plan dictionaries
 
-        return self._call_llm(prompt)
+        Returns:
+            One analysis per plan, in order
+        """
+        prompt_template = self.T.explain_plan
+        if not prompt_template:
+            return ["Error: Query optimization prompt not found"] * len(plans)
+
+        render = _compile_template(prompt_template)
+        prompts = [render({'plan_data': self._format_execution_plan(plan)}) for plan in plans]
+
+        return self.batch(prompts)
 
     def explain_plan(self, plan: Dict[str, Any]) -> str:
         """
@@ -156,12 +834,12 @@ class LLMEngine:
         Returns:
             Simple explanation
         """
-        prompt_template = self.prompts.get('query_optimization', {}).get('explain_plan', '')
+        prompt_template = self.T.explain_plan
         if not prompt_template:
             return "Error: Explain plan prompt not found"
 
         plan_text = self._format_execution_plan(plan)
-        prompt = prompt_template.format(plan_data=plan_text)
+        prompt = _compile_template(prompt_template)({'plan_data': plan_text})
 
         return self._call_llm(prompt)
 
@@ -175,12 +853,12 @@ class LLMEngine:
         Returns:
             Analysis of costly operations
         """
-        prompt_template = self.prompts.get('query_optimization', {}).get('identify_costly_operations', '')
+        prompt_template = self.T.identify_costly
         if not prompt_template:
             return "Error: Identify costly operations prompt not found"
 
         plan_text = self._format_execution_plan(plan)
-        prompt = prompt_template.format(plan_data=plan_text)
+        prompt = _compile_template(prompt_template)({'plan_data': plan_text})
 
         return self._call_llm(prompt)
 
@@ -195,15 +873,51 @@ class LLMEngine:
         Returns:
             Optimization suggestions
         """
-        prompt_template = self.prompts.get('query_optimization', {}).get('suggest_optimizations', '')
+        prompt_template = self.T.suggest
         if not prompt_template:
             return "Error: Suggest optimizations prompt not found"
 
         plan_text = self._format_execution_plan(plan)
-        prompt = prompt_template.format(sql_query=sql_query, plan_data=plan_text)
+        prompt = _compile_template(prompt_template)({'sql_query': sql_query, 'plan_data': plan_text})
 
         return self._call_llm(prompt)
 
+    def analyze_plan_combo(self, sql_query: str, plan: Dict[str, Any]) -> Dict[str, str]:
+        """
+        Explain the plan, identify costly operations and suggest optimizations
+        in a single LLM call instead of three.
+
+        The prompt can be overridden with query_optimization.combined_analysis
+        (placeholders: {sql_query}, {plan_data}). Sections the model did not
+        return are filled with the dedicated per-section method.
+
+        Args:
+            sql_query: The SQL query text
+            plan: Execution plan dictionary
+
+        Returns:
+            Dictionary with 'explain', 'costly' and 'suggest' texts
+        """
+        plan_text = self._format_execution_plan(plan)
+        prompt = _compile_template(self.T.combo)({'sql_query': sql_query, 'plan_data': plan_text})
+        response = self._call_llm(prompt, max_tokens=3072)
+
+        sections = {}
+        if not response.startswith("Error:"):
+            # [preamble, name1, body1, name2, body2, ...]
+            parts = _COMBO_SPLIT_RE.split(response)
+            for name, body in zip(parts[1::2], parts[2::2]):
+                body = body.strip()
+                if body and name not in sections:
+                    sections[name] = body
+
+        fallbacks = {
+            "EXPLAIN": lambda: self.explain_plan(plan),
+            "COSTLY": lambda: self.identify_costly_operations(plan),
+            "SUGGEST": lambda: self.suggest_optimizations(sql_query, plan)
+        }
+        return {name.lower(): sections.get(name) or fallbacks[name]() for name in _COMBO_SECTIONS}
+
     def assess_security(self, config: Dict[str, Any]) -> str:
         """
         Assess security configuration.
@@ -214,39 +928,64 @@ class LLMEngine:
         Returns:
             Security assessment report
         """
-        prompt_template = self.prompts.get('security_audit', {}).get('analyze_users_roles', '')
+        prompt_template = self.T.security
         if not prompt_template:
             return "Error: Security audit prompt not found"
 
         # Format config for prompt
         config_text = self._format_security_config(config)
 
-        prompt = prompt_template.format(users_roles_data=config_text)
+        prompt = _compile_template(prompt_template)({'users_roles_data': config_text})
 
         return self._call_llm(prompt)
 
-    def detect_anomaly(self, log_entry: Dict[str, Any], context: str = None) -> str:
+    def detect_anomaly(self, log_entry: Dict[str, Any], context: str = None,
+                       early_stop: bool = False) -> str:
         """
         Detect anomalies in audit logs.
 
         Args:
             log_entry: Audit log entry
             context: Additional context
+            early_stop: Stop generating once the verdict and two justification
+                sentences are in (free-text answers only)
 
         Returns:
             Anomaly assessment
         """
-        prompt_template = self.prompts.get('anomaly_detection', {}).get('analyze_log_entry', '')
+        prompt_template = self.T.anomaly
         if not prompt_template:
             return "Error: Anomaly detection prompt not found"
 
         # Format log entry for prompt
         log_text = self._format_audit_log(log_entry)
 
-        prompt = prompt_template.format(log_entry=log_text)
+        prompt = _compile_template(prompt_template)({'log_entry': log_text})
 
+        if early_stop:
+            return self._call_llm_until(prompt, context, _anomaly_verdict_complete)
         return self._call_llm(prompt, context)
 
+    def detect_anomalies(self, log_entries: List[Dict[str, Any]], contexts: List[str] = None) -> List[str]:
+        """
+        Detect anomalies in several audit log entries concurrently.
+
+        Args:
+            log_entries: Audit log entries
+            contexts: Optional contexts, one per entry
+
+        Returns:
+            One anomaly assessment per entry, in order
+        """
+        prompt_template = self.T.anomaly
+        if not prompt_template:
+            return ["Error: Anomaly detection prompt not found"] * len(log_entries)
+
+        render = _compile_template(prompt_template)
+        prompts = [render({'log_entry': self._format_audit_log(entry)}) for entry in log_entries]
+
+        return self.batch(prompts, contexts)
+
     def _format_execution_plan(self, plan) -> str:
         """
         Format execution plan for prompt input.
@@ -255,11 +994,25 @@ class LLMEngine:
             plan: Execution plan dictionary or list
 
         Returns:
-            Formatted plan text
+            Formatted plan text (ASCII only when ascii_only_plans is set)
         """
+        text = self._format_plan_text(plan)
+        if self.ascii_only_plans and not text.isascii():
+            # Non-ASCII bytes cost several tokens each and carry no plan information
+            text = text.encode('ascii', 'ignore').decode('ascii')
+        return text
+
+    def _format_plan_text(self, plan) -> str:
+        """Plan text before ASCII normalization (see _format_execution_plan)."""
         if isinstance(plan, list):
-            lines = ["📋 Execution Plan:"]
-            for step in plan:
+            lines = ["Execution Plan:"]
+            steps = plan
+            if len(plan) > self.max_plan_steps:
+                # Keep the costliest steps, in plan order
+                ranked = sorted(range(len(plan)), key=lambda i: -self._as_number(plan[i].get('cost')))
+                steps = [plan[i] for i in sorted(ranked[:self.max_plan_steps])]
+            size = 0
+            for step in steps:
                 id_val = step.get('id', 0)
                 operation = step.get('operation', 'UNKNOWN')
                 options = step.get('options', '')
@@ -267,12 +1020,16 @@ class LLMEngine:
                 cost = step.get('cost', 0)
                 cardinality = step.get('cardinality', 0)
                 op_text = f"{operation} {options}".strip()
-                line = f"  {id_val}: {op_text}"
-                if object_name:
-                    line += f" on {object_name}"
-                if cost or cardinality:
-                    line += f" (Cost: {cost}, Rows: {cardinality})"
+                on_text = f" on {object_name}" if object_name else ""
+                cost_text = f" (Cost: {cost}, Rows: {cardinality})" if (cost or cardinality) else ""
+                line = f"  {id_val}: {op_text}{on_text}{cost_text}"
+                size += len(line) + 1
+                if size > self.max_prompt_chars:
+                    break
                 lines.append(line)
+            omitted = len(plan) - (len(lines) - 1)
+            if omitted:
+                lines.append(f"  ... ({omitted} rows omitted)")
             return "\n".join(lines)
         elif isinstance(plan, dict):
             lines = []
@@ -283,36 +1040,48 @@ class LLMEngine:
 
     def _format_plan_recursive(self, plan: Dict[str, Any], lines: List[str], depth: int):
         """
-        Recursively format plan tree.
+        Format plan tree (depth-first, pre-order) using an explicit stack.
+        Stops once the text reaches max_prompt_chars.
 
         Args:
             plan: Plan node
             lines: Output lines
             depth: Current depth
         """
-        indent = "  " * depth
-
-        operation = plan.get('operation', 'UNKNOWN')
-        object_name = plan.get('object_name', '')
-        cost = plan.get('cost', '')
-        cardinality = plan.get('cardinality', '')
-
-        line = f"{indent}{operation}"
-        if object_name:
-            line += f" on {object_name}"
-        if cost:
-            line += f" (Cost: {cost}"
-        if cardinality:
-            line += f", Rows: {cardinality}"
-        if cost or cardinality:
-            line += ")"
-
-        lines.append(line)
-
-        # Process children
-        if 'children' in plan and plan['children']:
-            for child in plan['children']:
-                self._format_plan_recursive(child, lines, depth + 1)
+        indents = self._INDENTS
+        stack = [(plan, depth)]
+        size = 0
+
+        while stack:
+            node, level = stack.pop()
+            get = node.get
+
+            cost = get('cost', '')
+            cardinality = get('cardinality', '')
+            object_name = get('object_name', '')
+
+            parts = [indents[level] if level < len(indents) else "  " * level, str(get('operation', 'UNKNOWN'))]
+            if object_name:
+                parts += [" on ", str(object_name)]
+            if cost:
+                parts += [" (Cost: ", str(cost)]
+            if cardinality:
+                parts += [", Rows: ", str(cardinality)]
+            if cost or cardinality:
+                parts.append(")")
+
+            line = "".join(parts)
+            size += len(line) + 1
+            if size > self.max_prompt_chars:
+                lines.append(f"{line[:len(line) - len(line.lstrip())]}... (plan truncated)")
+                return
+            lines.append(line)
+
+            # Children pushed in reverse so they are emitted in order
+            children = get('children')
+            if children:
+                for child in reversed(children):
+                    stack.append((child, level + 1))
 
     def _format_security_config(self, config: Dict[str, Any]) -> str:
         """
@@ -325,27 +1094,45 @@ class LLMEngine:
             Formatted config text
         """
         lines = []
+        cap = self.max_config_entries
 
         if 'users' in config:
             lines.append("Users:")
-            for user in config['users']:
+            for user in config['users'][:cap]:
                 status = user.get('account_status', 'UNKNOWN')
                 lines.append(f"  - {user.get('username', 'UNKNOWN')}: {status}")
+            self._append_omitted(lines, config['users'], cap)
 
         if 'roles' in config:
             lines.append("\nRoles:")
-            for role in config['roles']:
+            for role in config['roles'][:cap]:
                 lines.append(f"  - {role.get('role', 'UNKNOWN')}")
+            self._append_omitted(lines, config['roles'], cap)
 
         if 'privileges' in config:
             lines.append("\nPrivileges:")
-            for priv in config['privileges']:
+            for priv in config['privileges'][:cap]:
                 grantee = priv.get('grantee', 'UNKNOWN')
                 privilege = priv.get('privilege', 'UNKNOWN')
                 lines.append(f"  - {grantee}: {privilege}")
+            self._append_omitted(lines, config['privileges'], cap)
 
         return "\n".join(lines)
 
+    @staticmethod
+    def _append_omitted(lines: List[str], entries, cap: int):
+        """Note how many entries were cut from a capped section."""
+        if len(entries) > cap:
+            lines.append(f"  ... ({len(entries) - cap} more)")
+
+    @staticmethod
+    def _as_number(value) -> float:
+        """Numeric plan cost for ranking (missing/invalid -> 0)."""
+        try:
+            return float(value or 0)
+        except (TypeError, ValueError):
+            return 0.0
+
     def _format_audit_log(self, log_entry: Dict[str, Any]) -> str:
         """
         Format audit log entry for prompt input.
@@ -362,7 +1149,8 @@ class LLMEngine:
         object_name = log_entry.get('object', 'UNKNOWN')
         return_type = log_entry.get('returncode', 'UNKNOWN')
 
-        return f"Timestamp: {timestamp}\nUser: {user}\nAction: {action}\nObject: {object_name}\nReturn Code: {return_type}"
+        text = f"Timestamp: {timestamp}\nUser: {user}\nAction: {action}\nObject: {object_name}\nReturn Code: {return_type}"
+        return text[:self.max_log_chars]
 
     def get_available_models(self) -> List[str]:
         """
@@ -378,16 +1166,41 @@ class LLMEngine:
             "llama2-70b-4096"
         ]
 
+    def warm_up(self) -> bool:
+        """
+        Open the pooled HTTPS connection ahead of the first real call
+        (token-free request: list models), so it skips DNS + TLS setup.
+
+        Returns:
+            True if the API answered
+        """
+        try:
+            self.client.models.list()
+            return True
+        except Exception as e:
+            print(f"Warm-up failed: {e}")
+            return False
+
     def test_connection(self) -> bool:
         """
         Test LLM API connection.
 
+        Single direct probe (2 tokens, no retry, no cache): a cached answer
+        would not prove the API is reachable.
+
         Returns:
             True if connection successful
         """
         try:
-            response = self.generate("Hello, respond with 'OK' if you can read this.")
-            return "OK" in response.upper()
+            response = self.client.chat.completions.create(
+                model=self.model,
+                messages=[{"role": "user", "content": "Say OK"}],
+                temperature=0,
+                max_tokens=2,
+                top_p=1,
+                stream=False
+            )
+            return "OK" in (response.choices[0].message.content or "").upper()
         except Exception as e:
             print(f"Connection test failed: {e}")
             return False
@@ -402,37 +1215,50 @@ class LLMEngine:
         Returns:
             Category name (DATABASE_QUERY, QUERY_OPTIMIZATION, etc.)
         """
-        prompt_template = self.prompts.get('intent_classification', {}).get('classify_intent', '')
+        prompt_template = self.T.intent
         
         if not prompt_template:
             print("Warning: Intent classification prompt not found, using fallback")
             return "GENERAL_HELP"
         
         # Format the prompt
-        formatted_prompt = prompt_template.format(user_prompt=user_prompt)
+        formatted_prompt = _compile_template(prompt_template)({'user_prompt': user_prompt})
         
         # Get classification with low temperature for consistency
         try:
-            classification = self._call_llm(formatted_prompt, temperature=0.0)
+            messages = self._build_messages(formatted_prompt)
+            cached, _ = self._cache_lookup(messages, 0.0, self.model, 2048)
+            if cached is not None:
+                classification = cached
+            else:
+                # Stream and stop as soon as a category has been emitted
+                classification = ""
+                stream = self._call_llm_stream(formatted_prompt, temperature=0.0, max_tokens=2048)
+                try:
+                    for token in stream:
+                        classification += token
+                        # A new match must end in this token: only scan the tail
+                        start = max(0, len(classification) - len(token) - _CAT_MAX_LEN + 1)
+                        match = _CAT_RE.search(classification[start:].upper())
+                        if match:
+                            category = match.group(0)
+                            self._cache_store(messages, 0.0, category, None, self.model, 2048)
+                            return category
+                    self._cache_store(messages, 0.0, classification.strip(), None, self.model, 2048)
+                except Exception as e:
+                    # Fall back to the regular call (with retries)
+                    print(f"Streaming classification failed: {e}")
+                    classification = self._call_llm(formatted_prompt, temperature=0.0)
+                finally:
+                    stream.close()
             
             # Clean up response (remove any extra text)
-            classification = classification.strip().upper()
-            
-            # Validate response
-            valid_categories = [
-                "DATABASE_QUERY",
-                "QUERY_OPTIMIZATION",
-                "SECURITY_AUDIT",
-                "ANOMALY_DETECTION",
-                "BACKUP_STRATEGY",
-                "RECOVERY_GUIDE",
-                "GENERAL_HELP"
-            ]
+            classification = classification.strip().upper().translate(_PUNCT_STRIP)
             
             # Extract category from response if LLM added extra text
-            for category in valid_categories:
-                if category in classification:
-                    return category
+            match = _CAT_RE.search(classification)
+            if match:
+                return match.group(0)
             
             # Fallback if no valid category found
             print(f"Warning: Invalid classification '{classification}', using GENERAL_HELP")
@@ -10,13 +10,124 @@ MODULE 6 : Détection d'Anomalies & Cybersécurité Oracle - COMPLET
 """
 
 import json
+import os
 import re
+import warnings
+import numpy as np
 import pandas as pd
-from datetime import datetime, timedelta
-from typing import Dict, List, Tuple, Optional
+from datetime import datetime
+from typing import Dict, List, Tuple, Optional, Iterator
 from pathlib import Path
+from bisect import bisect_right
 from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from functools import lru_cache
+from pickle import PicklingError
 
+try:
+    import orjson  # parsing plus rapide des réponses JSON du LLM
+except ImportError:
+    orjson = None
+
+try:
+    import ahocorasick  # pyahocorasick : tous les fragments du préfiltre en une passe
+except ImportError:
+    ahocorasick = None
+
+try:
+    import hyperscan  # Intel Hyperscan : tous les patterns en un seul passage SIMD
+except ImportError:
+    hyperscan = None
+
+
+def _build_prefilter_automaton(prefilter: Dict[str, Tuple[str, ...]]):
+    """Automate Aho-Corasick fragment -> types d'attaque (None sans pyahocorasick)"""
+    if ahocorasick is None:
+        return None
+    keyword_types = defaultdict(list)
+    for attack_type, keywords in prefilter.items():
+        for keyword in keywords:
+            keyword_types[keyword].append(attack_type)
+    automaton = ahocorasick.Automaton()
+    for keyword, attack_types in keyword_types.items():
+        automaton.add_word(keyword, tuple(attack_types))
+    automaton.make_automaton()
+    return automaton
+
+
+def _build_hyperscan_database(attack_patterns: Dict[str, Dict]):
+    """
+    Base Hyperscan de tous les patterns (None sans hyperscan ou si la compilation échoue).
+    Hyperscan ne gère pas les lookaheads : HS_FLAG_PREFILTER compile une
+    approximation qui matche au moins tout ce que matche le pattern, le
+    résultat est ensuite confirmé par re. L'id d'un match est l'index du type.
+    """
+    if hyperscan is None:
+        return None
+    attack_types = [attack_type for attack_type, info in attack_patterns.items() if info['patterns']]
+    expressions, ids = [], []
+    for index, attack_type in enumerate(attack_types):
+        for pattern in attack_patterns[attack_type]['patterns']:
+            expressions.append(pattern.removeprefix('(?i)').encode())
+            ids.append(index)
+    flags = hyperscan.HS_FLAG_CASELESS | hyperscan.HS_FLAG_SINGLEMATCH | hyperscan.HS_FLAG_PREFILTER
+    try:
+        database = hyperscan.Database()
+        database.compile(expressions=expressions, ids=ids, elements=len(expressions),
+                         flags=[flags] * len(expressions))
+    except hyperscan.error as e:
+        print(f"⚠️ Hyperscan indisponible, repli sur re : {e}")
+        return None
+    return database, attack_types
+
+
+# Plus courte date ISO acceptée par fromisoformat ('2024W01')
+_MIN_ISO_LENGTH = 7
+
+
+@lru_cache(maxsize=4096)
+def _is_off_hours(timestamp: str) -> bool:
+    """Nuit (22h-6h) ou week-end ; mis en cache, les logs d'un lot partagent souvent leurs timestamps"""
+    try:
+        # fromisoformat accepte directement l'espace comme séparateur date/heure
+        dt = datetime.fromisoformat(timestamp)
+    except ValueError:
+        return False
+    return dt.hour >= 22 or dt.hour <= 6 or dt.weekday() >= 5
+
+
+# Détecteur propre à chaque processus de analyze_bulk (patterns compilés une fois par worker)
+_worker_detector = None
+
+
+def _init_scan_worker():
+    global _worker_detector
+    _worker_detector = OracleAnomalyDetector()
+
+
+def _scan_attack_types(fields: Tuple[str, str, str]) -> List[str]:
+    """Types d'attaque détectés pour (sql_text, action, object_name), côté worker"""
+    sql_text, action, object_name = fields
+    log = {'sql_text': sql_text, 'action': action, 'object_name': object_name}
+    return [attack_type for attack_type, _ in _worker_detector.detect_attack_patterns(log)]
+
+# Seuils de score -> niveau (bisect) et niveau -> score
+_SEVERITY_THRESHOLDS = (20, 40, 70, 90)
+_SEVERITY_NAMES = ('NORMAL', 'BAS', 'MOYEN', 'HAUT', 'CRITIQUE')
+_SEVERITY_SCORES = {'CRITIQUE': 100, 'HAUT': 70, 'MOYEN': 40, 'BAS': 20, 'NORMAL': 0}
+
+
+def _attach_severity_scores(cls):
+    """Recopie score et action de SEVERITY_LEVELS dans chaque entrée de ATTACK_PATTERNS"""
+    for attack_info in cls.ATTACK_PATTERNS.values():
+        level = cls.SEVERITY_LEVELS[attack_info['severity']]
+        attack_info['score'] = level['score']
+        attack_info['action'] = level['action']
+    return cls
+
+
+@_attach_severity_scores
 class OracleAnomalyDetector:
     """Détecteur d'anomalies de sécurité Oracle avec IA"""
     
@@ -41,7 +152,8 @@ class OracleAnomalyDetector:
         },
         'DATA_EXFILTRATION': {
             'patterns': [
-                r"(?i)(select.*from.*password|select.*from.*credit)",
+                # Premier FROM après le SELECT imposé : pas de retour arrière quadratique
+                r"(?i)(select(?:(?!from).)*from.*(?:password|credit))",
                 r"(?i)(utl_http|utl_smtp|utl_file\.put_line)",
             ],
             'severity': 'CRITIQUE',
@@ -77,6 +189,64 @@ class OracleAnomalyDetector:
         }
     }
     
+    # Préfiltre par sous-chaînes (texte ASCII en minuscules) : tout match d'un
+    # pattern du type contient forcément l'un de ces fragments littéraux
+    _PREFILTER = {
+        'SQL_INJECTION': ('union', 'or', ';--', '*/', '/*', 'xp_cmdshell', 'drop', 'exec'),
+        'PRIVILEGE_ESCALATION': ('grant', 'identified', 'dba'),
+        'DATA_EXFILTRATION': ('password', 'credit', 'utl_'),
+        'BRUTE_FORCE': ('failed', 'password'),
+        'SUSPICIOUS_DDL': ('audit', 'drop'),
+        'SENSITIVE_ACCESS': ('sys.aud$', 'dba_', 'all_passwords', 'user_history')
+    }
+    _PREFILTER_AUTOMATON = _build_prefilter_automaton(_PREFILTER)
+    _HYPERSCAN = _build_hyperscan_database(ATTACK_PATTERNS)
+    
+    # Une alternation compilée par type d'attaque (une seule recherche par type),
+    # construite au chargement de la classe ; les types sans pattern sont omis.
+    # Le (?i) en tête de chaque pattern est remplacé par re.IGNORECASE.
+    _MERGED_PATTERNS = {
+        attack_type: (
+            re.compile(
+                "|".join(f"(?:{pattern.removeprefix('(?i)')})" for pattern in attack_info['patterns']),
+                re.IGNORECASE
+            ),
+            attack_info
+        )
+        for attack_type, attack_info in ATTACK_PATTERNS.items()
+        if attack_info['patterns']
+    }
+    # Toutes les alternations réunies en une regex à groupes nommés : un seul
+    # passage sur le texte, match.lastgroup donne le type d'attaque trouvé
+    _MASTER_PATTERN = re.compile(
+        "|".join(f"(?P<{attack_type}>{pattern.pattern})" for attack_type, (pattern, _) in _MERGED_PATTERNS.items()),
+        re.IGNORECASE
+    )
+    # Mêmes regex sans drapeau, pour le texte ASCII mis en minuscules une fois
+    # (patterns écrits en minuscules) : sans IGNORECASE, sre peut sauter
+    # directement au premier caractère possible au lieu de tester chaque casse
+    _MERGED_PATTERNS_LOWER = {
+        attack_type: (re.compile(pattern.pattern), attack_info)
+        for attack_type, (pattern, attack_info) in _MERGED_PATTERNS.items()
+    }
+    _MASTER_PATTERN_LOWER = re.compile(_MASTER_PATTERN.pattern)
+    
+    # En dessous, le démarrage des processus coûte plus que la détection elle-même
+    BULK_MIN_LOGS = 20000
+    
+    # Colonnes d'un log d'audit (valeurs toujours en str, '' si absentes)
+    LOG_COLUMNS = ['timestamp', 'username', 'action', 'object_name',
+                   'sql_text', 'client_ip', 'returncode', 'session_id']
+    # Lecture CSV : seules les colonnes utiles, tout en str sans inférence de
+    # types ni détection des NA (cellules vides -> ''), pas d'iterrows
+    _CSV_OPTIONS = {
+        'usecols': lambda column: column in OracleAnomalyDetector.LOG_COLUMNS,
+        'dtype': str,
+        'na_filter': False,
+        'engine': 'c'
+    }
+    CSV_CHUNKSIZE = 100_000
+    
     SEVERITY_LEVELS = {
         'CRITIQUE': {'score': 100, 'action': 'BLOQUER IMMÉDIATEMENT'},
         'HAUT': {'score': 70, 'action': 'INVESTIGATION URGENTE'},
@@ -99,21 +269,8 @@ class OracleAnomalyDetector:
     def load_audit_logs_from_csv(self, csv_path: str) -> List[Dict]:
         """Charge les logs d'audit depuis un CSV"""
         try:
-            df = pd.read_csv(csv_path)
-            logs = []
-            
-            for _, row in df.iterrows():
-                log = {
-                    'timestamp': row.get('timestamp', ''),
-                    'username': row.get('username', ''),
-                    'action': row.get('action', ''),
-                    'object_name': row.get('object_name', ''),
-                    'sql_text': row.get('sql_text', ''),
-                    'client_ip': row.get('client_ip', ''),
-                    'returncode': str(row.get('returncode', '')),
-                    'session_id': row.get('session_id', '')
-                }
-                logs.append(log)
+            df = pd.read_csv(csv_path, **self._CSV_OPTIONS)
+            logs = self._records_from_frame(df)
             
             print(f"✅ {len(logs)} logs chargés depuis {csv_path}")
             return logs
@@ -122,43 +279,246 @@ class OracleAnomalyDetector:
             print(f"❌ Erreur chargement logs: {e}")
             return []
     
+    def iter_audit_logs_from_csv(self, csv_path: str, chunksize: int = CSV_CHUNKSIZE) -> Iterator[List[Dict]]:
+        """
+        Lecture en flux d'un CSV d'audit volumineux : des lots d'au plus
+        chunksize logs, sans jamais charger tout le fichier en mémoire
+        """
+        for chunk in self._iter_csv_chunks(csv_path, chunksize):
+            yield self._records_from_frame(chunk)
+    
+    def analyze_csv(self, csv_path: str, chunksize: int = CSV_CHUNKSIZE) -> Iterator[Dict]:
+        """Analyse en flux d'un CSV d'audit, lot par lot (analyze_bulk), rapport par rapport"""
+        for chunk in self._iter_csv_chunks(csv_path, chunksize):
+            # Heures ouvrables calculées une fois pour tout le lot (à la place
+            # de check_off_hours_access log par log)
+            all_off_hours = self._off_hours_column(chunk['timestamp']).tolist()
+            yield from self.analyze_bulk(self._records_from_frame(chunk), all_off_hours=all_off_hours)
+    
+    def _iter_csv_chunks(self, csv_path: str, chunksize: int) -> Iterator[pd.DataFrame]:
+        """Lots du CSV réindexés sur LOG_COLUMNS ('' si absentes)"""
+        try:
+            for chunk in pd.read_csv(csv_path, chunksize=chunksize, **self._CSV_OPTIONS):
+                yield chunk.reindex(columns=self.LOG_COLUMNS, fill_value='')
+        except Exception as e:
+            print(f"❌ Erreur chargement logs: {e}")
+    
+    def _records_from_frame(self, df: pd.DataFrame) -> List[Dict]:
+        """DataFrame de logs -> liste de dicts (colonnes LOG_COLUMNS, '' si absentes)"""
+        return df.reindex(columns=self.LOG_COLUMNS, fill_value='').to_dict(orient='records')
+    
     def detect_attack_patterns(self, log: Dict) -> List[Tuple[str, Dict]]:
-        """Détecte les patterns d'attaques dans un log"""
+        """Détecte les patterns d'attaques dans un log (fonction pure : stats tenues par _rule_based_analysis)"""
         detected_attacks = []
         sql_text = log.get('sql_text', '')
         action = log.get('action', '')
         object_name = log.get('object_name', '')
+        # Log sans texte (connexions, etc.) : rien à concaténer ni à scanner
+        if not (sql_text or action or object_name):
+            return detected_attacks
         combined_text = f"{sql_text} {action} {object_name}"
         
-        for attack_type, attack_info in self.ATTACK_PATTERNS.items():
-            patterns = attack_info['patterns']
-            
-            for pattern in patterns:
-                if re.search(pattern, combined_text, re.IGNORECASE):
-                    detected_attacks.append((attack_type, attack_info))
-                    self.stats['attacks_detected'][attack_type] += 1
-                    break
+        # Préfiltre (simples tests d'inclusion) : la plupart des logs n'atteignent
+        # jamais les regex. Hors ASCII, la casse Unicode de re.IGNORECASE ne
+        # correspond pas à lower() : tous les types restent candidats.
+        if combined_text.isascii():
+            text = combined_text.lower()
+            merged_patterns, master_pattern = self._MERGED_PATTERNS_LOWER, self._MASTER_PATTERN_LOWER
+            if self._HYPERSCAN is not None:
+                # Tous les patterns en un passage ; un match (approché) par type suffit
+                database, attack_types = self._HYPERSCAN
+                hit_types = set()
+                database.scan(
+                    text.encode(),
+                    match_event_handler=lambda index, start, end, flags, context: hit_types.add(attack_types[index])
+                )
+                candidates = [attack_type for attack_type in merged_patterns if attack_type in hit_types]
+            elif self._PREFILTER_AUTOMATON is not None:
+                # Un seul passage pour tous les fragments, quel que soit leur nombre
+                hit_types = {
+                    attack_type
+                    for _, attack_types in self._PREFILTER_AUTOMATON.iter(text)
+                    for attack_type in attack_types
+                }
+                candidates = [attack_type for attack_type in merged_patterns if attack_type in hit_types]
+            else:
+                candidates = [
+                    attack_type for attack_type in merged_patterns
+                    if any(keyword in text for keyword in self._PREFILTER[attack_type])
+                ]
+            if not candidates:
+                return detected_attacks
+        else:
+            text = combined_text
+            merged_patterns, master_pattern = self._MERGED_PATTERNS, self._MASTER_PATTERN
+            candidates = list(merged_patterns)
+        
+        # Passage unique : aucun match = aucune attaque
+        found = {match.lastgroup for match in master_pattern.finditer(text)}
+        if not found:
+            return detected_attacks
+        
+        # Les matches ne se chevauchent pas : un type masqué par le match d'un
+        # autre est revérifié avec sa propre alternation
+        for attack_type in candidates:
+            pattern, attack_info = merged_patterns[attack_type]
+            if attack_type in found or pattern.search(text):
+                detected_attacks.append((attack_type, attack_info))
         
         return detected_attacks
     
+    def classify_bulk(self, df: pd.DataFrame) -> pd.Series:
+        """
+        Détection vectorisée des patterns sur tout un DataFrame de logs :
+        une passe str.contains par type d'attaque sur la colonne combinée,
+        au lieu d'un appel Python par log.
+        Renvoie, par ligne, la liste des types détectés (ordre de ATTACK_PATTERNS)
+        """
+        columns = [
+            df[col].fillna('').astype(str) if col in df.columns else pd.Series('', index=df.index)
+            for col in ('sql_text', 'action', 'object_name')
+        ]
+        # dtype object : moteur re de Python (les chaînes Arrow passent par RE2,
+        # qui ne connaît pas les lookaheads des patterns)
+        combined = (columns[0] + ' ' + columns[1] + ' ' + columns[2]).astype(object)
+        
+        with warnings.catch_warnings():
+            # Groupes capturants des patterns : seul le booléen nous intéresse
+            warnings.filterwarnings('ignore', message='This pattern is interpreted as a regular expression')
+            hits = pd.DataFrame({
+                attack_type: combined.str.contains(pattern, regex=True, na=False)
+                for attack_type, (pattern, _) in self._MERGED_PATTERNS.items()
+            }, index=df.index)
+        
+        for attack_type in hits.columns:
+            self.stats['attacks_detected'][attack_type] += int(hits[attack_type].sum())
+        
+        attack_types = list(hits.columns)
+        return pd.Series(
+            [[attack_type for attack_type, hit in zip(attack_types, row) if hit] for row in hits.to_numpy()],
+            index=df.index, dtype=object
+        )
+    
     def check_off_hours_access(self, timestamp: str) -> bool:
         """Vérifie si l'accès est en dehors des heures ouvrables"""
-        try:
-            dt = datetime.fromisoformat(timestamp.replace(' ', 'T'))
-            hour = dt.hour
-            is_night = hour >= 22 or hour <= 6
-            is_weekend = dt.weekday() >= 5
-            return is_night or is_weekend
-        except:
+        # Timestamp absent ou trop court : rejeté sans lever d'exception
+        if not isinstance(timestamp, str) or len(timestamp) < _MIN_ISO_LENGTH:
             return False
+        return _is_off_hours(timestamp)
+    
+    def _off_hours_column(self, timestamps: pd.Series) -> pd.Series:
+        """Version vectorisée de check_off_hours_access sur une colonne de timestamps"""
+        try:
+            # Timestamps invalides -> NaT : toutes les comparaisons valent False
+            dt = pd.to_datetime(timestamps, errors='coerce', format='ISO8601')
+            hour = dt.dt.hour
+            return ((hour >= 22) | (hour <= 6) | (dt.dt.dayofweek >= 5)).astype(bool)
+        except (ValueError, TypeError, AttributeError):
+            # Fuseaux horaires mélangés : pas de colonne datetime unique
+            return timestamps.map(self.check_off_hours_access).astype(bool)
     
     def analyze_log_entry(self, log: Dict, all_logs: List[Dict] = None) -> Dict:
         """Analyse complète d'un log d'audit"""
+        rules = self._rule_based_analysis(log)
+        
+        # Analyse LLM si disponible et utile
+        llm_analysis = {}
+        if self._needs_llm(rules):
+            llm_analysis = self._get_llm_analysis(log, rules['detected_attacks'])
+        
+        return self._build_report(log, rules, llm_analysis)
+    
+    def analyze_logs(self, logs: List[Dict]) -> List[Dict]:
+        """
+        Analyse d'un lot de logs : règles d'abord (CPU, local), puis toutes
+        les analyses LLM envoyées en parallèle en un seul batch.
+        Résultats identiques à analyze_log_entry appelé sur chaque log.
+        """
+        return self._analyze_logs(logs)
+    
+    def analyze_bulk(self, logs: List[Dict], max_workers: Optional[int] = None,
+                     all_off_hours: Optional[List[bool]] = None) -> List[Dict]:
+        """
+        Comme analyze_logs, mais la détection des patterns (pure) est répartie
+        sur tous les cœurs. Statistiques et LLM restent dans le processus
+        principal. Petits lots (ou pool indisponible) : analyse en série.
+        all_off_hours : indicateurs hors heures ouvrables déjà calculés,
+        parallèles à logs (analyze_csv)
+        """
+        workers = max_workers or os.cpu_count() or 1
+        if workers < 2 or len(logs) < self.BULK_MIN_LOGS:
+            return self._analyze_logs(logs, all_off_hours=all_off_hours)
+        
+        fields = [
+            (log.get('sql_text', ''), log.get('action', ''), log.get('object_name', ''))
+            for log in logs
+        ]
+        try:
+            with ProcessPoolExecutor(max_workers=workers, initializer=_init_scan_worker) as pool:
+                all_types = list(pool.map(
+                    _scan_attack_types, fields,
+                    chunksize=max(1, len(logs) // (4 * workers))
+                ))
+        except (BrokenProcessPool, OSError, PicklingError) as e:
+            print(f"⚠️ Analyse parallèle indisponible, passage en série : {e}")
+            return self._analyze_logs(logs, all_off_hours=all_off_hours)
+        
+        all_attacks = [
+            [(attack_type, self.ATTACK_PATTERNS[attack_type]) for attack_type in attack_types]
+            for attack_types in all_types
+        ]
+        return self._analyze_logs(logs, all_attacks, all_off_hours)
+    
+    def _analyze_logs(self, logs: List[Dict], all_attacks: Optional[List[List[Tuple]]] = None,
+                      all_off_hours: Optional[List[bool]] = None) -> List[Dict]:
+        """
+        Règles puis LLM en batch ; all_attacks / all_off_hours : détections et
+        indicateurs horaires déjà calculés (analyze_bulk, analyze_csv)
+        """
+        if all_attacks is None:
+            all_attacks = [None] * len(logs)
+        if all_off_hours is None:
+            all_off_hours = [None] * len(logs)
+        all_rules = [
+            self._rule_based_analysis(log, attacks, is_off_hours)
+            for log, attacks, is_off_hours in zip(logs, all_attacks, all_off_hours)
+        ]
+        
+        # Seuls les logs sans verdict définitif partent au LLM
+        llm_analyses = [{}] * len(logs)
+        pending = [i for i, rules in enumerate(all_rules) if self._needs_llm(rules)]
+        if pending:
+            analyses = self._get_llm_analyses(
+                [logs[i] for i in pending],
+                [all_rules[i]['detected_attacks'] for i in pending]
+            )
+            for i, llm_analysis in zip(pending, analyses):
+                llm_analyses[i] = llm_analysis
+        
+        return [
+            self._build_report(log, rules, llm_analysis)
+            for log, rules, llm_analysis in zip(logs, all_rules, llm_analyses)
+        ]
+    
+    def _needs_llm(self, rules: Dict) -> bool:
+        """
+        Un verdict CRITIQUE des règles est définitif : le LLM ne peut ni le
+        relever ni le modifier, l'appel (plusieurs secondes) est évité
+        """
+        return bool(self.llm) and rules['classification'] != 'CRITIQUE'
+    
+    def _rule_based_analysis(self, log: Dict, detected_attacks: Optional[List[Tuple]] = None,
+                             is_off_hours: Optional[bool] = None) -> Dict:
+        """Classification par règles (patterns + heures) et mise à jour des statistiques"""
         self.stats['total_logs'] += 1
         
-        # Détection patterns
-        detected_attacks = self.detect_attack_patterns(log)
-        is_off_hours = self.check_off_hours_access(log.get('timestamp', ''))
+        # Détection patterns (renvoyée dans le résultat, le log n'est pas modifié)
+        if detected_attacks is None:
+            detected_attacks = self.detect_attack_patterns(log)
+        for attack_type, _ in detected_attacks:
+            self.stats['attacks_detected'][attack_type] += 1
+        if is_off_hours is None:
+            is_off_hours = self.check_off_hours_access(log.get('timestamp', ''))
         
         # Classification
         classification = 'NORMAL'
@@ -167,11 +527,8 @@ class OracleAnomalyDetector:
         justifications = []
         
         if detected_attacks:
-            max_severity = max(
-                self.SEVERITY_LEVELS[attack[1]['severity']]['score'] 
-                for attack in detected_attacks
-            )
-            severity_score = max_severity
+            # Score précalculé sur chaque type d'attaque (_attach_severity_scores)
+            severity_score = max(attack_info['score'] for _, attack_info in detected_attacks)
             
             if severity_score >= 70:
                 classification = 'CRITIQUE'
@@ -194,11 +551,24 @@ class OracleAnomalyDetector:
             classification = 'NORMAL'
             self.stats['normal'] += 1
         
-        # Analyse LLM si disponible
-        llm_analysis = {}
-        if self.llm:
-            llm_analysis = self._get_llm_analysis(log, detected_attacks)
-
+        return {
+            'detected_attacks': detected_attacks,
+            'is_off_hours': is_off_hours,
+            'classification': classification,
+            'severity_score': severity_score,
+            'attack_types': attack_types,
+            'justifications': justifications
+        }
+    
+    def _build_report(self, log: Dict, rules: Dict, llm_analysis: Dict) -> Dict:
+        """Fusionne la classification par règles et l'analyse LLM en rapport final"""
+        classification = rules['classification']
+        severity_score = rules['severity_score']
+        attack_types = rules['attack_types']
+        justifications = rules['justifications']
+        is_off_hours = rules['is_off_hours']
+        
+        if llm_analysis:
             # Intégrer l'analyse LLM dans la classification
             if llm_analysis.get('classification') in ['SUSPECT', 'CRITIQUE']:
                 if classification == 'NORMAL':
@@ -216,15 +586,16 @@ class OracleAnomalyDetector:
                         self.stats['normal'] -= 1
 
         # Rapport
+        severity_level = self._score_to_severity(severity_score)
         report = {
             'log': log,
             'classification': classification,
             'severity_score': severity_score,
-            'severity_level': self._score_to_severity(severity_score),
+            'severity_level': severity_level,
             'attack_types': attack_types,
             'justifications': justifications,
             'is_off_hours': is_off_hours,
-            'recommended_action': llm_analysis.get('recommandation', self.SEVERITY_LEVELS[self._score_to_severity(severity_score)]['action']),
+            'recommended_action': llm_analysis.get('recommandation', self.SEVERITY_LEVELS[severity_level]['action']),
             'llm_analysis': llm_analysis,
             'timestamp': datetime.now().isoformat()
         }
@@ -233,51 +604,80 @@ class OracleAnomalyDetector:
     
     def _score_to_severity(self, score: int) -> str:
         """Convertit un score en niveau de sévérité"""
-        if score >= 90:
-            return 'CRITIQUE'
-        elif score >= 70:
-            return 'HAUT'
-        elif score >= 40:
-            return 'MOYEN'
-        elif score >= 20:
-            return 'BAS'
-        else:
-            return 'NORMAL'
+        return _SEVERITY_NAMES[bisect_right(_SEVERITY_THRESHOLDS, score)]
 
     def _severity_to_score(self, severity: str) -> int:
         """Convertit un niveau de sévérité en score"""
-        severity_map = {
-            'CRITIQUE': 100,
-            'HAUT': 70,
-            'MOYEN': 40,
-            'BAS': 20,
-            'NORMAL': 0
+        return _SEVERITY_SCORES.get(severity.upper(), 0)
+    
+    def _llm_request(self, log: Dict, attacks: List[Tuple]) -> Tuple[Dict, str]:
+        """Entrée (log formaté, contexte) pour la méthode detect_anomaly du LLM"""
+        # Formater le log pour la méthode detect_anomaly
+        log_entry = {
+            'timestamp': log.get('timestamp', 'UNKNOWN'),
+            'user': log.get('username', 'UNKNOWN'),
+            'action': log.get('action', 'UNKNOWN'),
+            'object': log.get('object_name', 'UNKNOWN'),
+            'returncode': log.get('returncode', 'UNKNOWN')
+        }
+
+        # Contexte avec attaques détectées
+        attacks_desc = ", ".join([attack[0] for attack in attacks]) if attacks else "Aucune attaque détectée"
+        context = f"Attaques détectées: {attacks_desc}. SQL: {log.get('sql_text', '')[:200]}"
+        return log_entry, context
+    
+    def _llm_error(self, error: Exception) -> Dict:
+        """Analyse par défaut quand le LLM est indisponible"""
+        return {
+            'classification': 'NORMAL',
+            'justification': f"⚠️ Analyse LLM non disponible: {str(error)}",
+            'severite': 'BAS',
+            'patterns_detectes': [],
+            'recommandation': 'Vérifier la configuration LLM'
         }
-        return severity_map.get(severity.upper(), 0)
     
     def _get_llm_analysis(self, log: Dict, attacks: List[Tuple]) -> Dict:
         """Obtient une analyse complète du LLM en utilisant la méthode detect_anomaly"""
         try:
-            # Formater le log pour la méthode detect_anomaly
-            log_entry = {
-                'timestamp': log.get('timestamp', 'UNKNOWN'),
-                'user': log.get('username', 'UNKNOWN'),
-                'action': log.get('action', 'UNKNOWN'),
-                'object': log.get('object_name', 'UNKNOWN'),
-                'returncode': log.get('returncode', 'UNKNOWN')
-            }
-
-            # Contexte avec attaques détectées
-            attacks_desc = ", ".join([attack[0] for attack in attacks]) if attacks else "Aucune attaque détectée"
-            context = f"Attaques détectées: {attacks_desc}. SQL: {log.get('sql_text', '')[:200]}"
+            log_entry, context = self._llm_request(log, attacks)
 
             # Utiliser la méthode spécialisée du LLM
-            llm_response = self.llm.detect_anomaly(log_entry, context)
+            # Seuls le verdict et sa justification sont exploités: arrêt anticipé
+            llm_response = self.llm.detect_anomaly(log_entry, context, early_stop=True)
+            return self._parse_llm_analysis(llm_response, attacks)
 
-            # Essayer de parser la réponse JSON
+        except Exception as e:
+            return self._llm_error(e)
+    
+    def _get_llm_analyses(self, logs: List[Dict], all_attacks: List[List[Tuple]]) -> List[Dict]:
+        """Analyses LLM d'un lot de logs en un seul batch concurrent"""
+        try:
+            requests = [self._llm_request(log, attacks) for log, attacks in zip(logs, all_attacks)]
+            responses = self.llm.detect_anomalies(
+                [log_entry for log_entry, _ in requests],
+                [context for _, context in requests]
+            )
+        except Exception as e:
+            return [self._llm_error(e) for _ in logs]
+
+        analyses = []
+        for llm_response, attacks in zip(responses, all_attacks):
+            try:
+                analyses.append(self._parse_llm_analysis(llm_response, attacks))
+            except Exception as e:
+                analyses.append(self._llm_error(e))
+        return analyses
+    
+    def _parse_llm_analysis(self, llm_response: str, attacks: List[Tuple]) -> Dict:
+        """Convertit la réponse LLM (JSON si possible) en analyse structurée"""
+        # Texte libre (cas fréquent) : pas de tentative de parsing, ni d'exception
+        stripped = llm_response.lstrip()
+        if stripped.startswith('{'):
             try:
-                import json
-                parsed = json.loads(llm_response)
+                parsed = orjson.loads(stripped) if orjson else json.loads(stripped)
+            except ValueError:  # JSONDecodeError de json comme d'orjson
+                parsed = None
+            if parsed is not None:
                 return {
                     'classification': parsed.get('classification', 'NORMAL'),
                     'justification': parsed.get('justification', llm_response[:300]),
@@ -285,43 +685,43 @@ class OracleAnomalyDetector:
                     'patterns_detectes': parsed.get('patterns_detectes', []),
                     'recommandation': parsed.get('recommandation', 'Surveillance continue')
                 }
-            except json.JSONDecodeError:
-                # Si pas de JSON, retourner une analyse basique
-                return {
-                    'classification': 'SUSPECT' if attacks else 'NORMAL',
-                    'justification': llm_response[:300],
-                    'severite': 'HAUT' if attacks else 'BAS',
-                    'patterns_detectes': [attack[0] for attack in attacks],
-                    'recommandation': 'Analyser davantage' if attacks else 'Aucune action requise'
-                }
-
-        except Exception as e:
-            return {
-                'classification': 'NORMAL',
-                'justification': f"⚠️ Analyse LLM non disponible: {str(e)}",
-                'severite': 'BAS',
-                'patterns_detectes': [],
-                'recommandation': 'Vérifier la configuration LLM'
-            }
+        
+        # Si pas de JSON, retourner une analyse basique
+        return {
+            'classification': 'SUSPECT' if attacks else 'NORMAL',
+            'justification': llm_response[:300],
+            'severite': 'HAUT' if attacks else 'BAS',
+            'patterns_detectes': [attack[0] for attack in attacks],
+            'recommandation': 'Analyser davantage' if attacks else 'Aucune action requise'
+        }
     
-    def detect_attack_sequences(self, logs: List[Dict]) -> List[Dict]:
-        """Détecte des séquences d'attaques coordonnées"""
+    def detect_attack_sequences(self, logs: List[Dict],
+                                all_attacks: Optional[List[List[Tuple]]] = None) -> List[Dict]:
+        """
+        Détecte des séquences d'attaques coordonnées ; all_attacks : résultats de
+        detect_attack_patterns déjà calculés, parallèles à logs (pas de second
+        passage des regex), sinon calculés ici pour les sessions concernées
+        """
         sequences = []
         
-        user_sessions = defaultdict(list)
-        for log in logs:
-            key = f"{log.get('username', '')}_{log.get('client_ip', '')}"
-            user_sessions[key].append(log)
+        # Un seul tri (stable) de tous les logs : chaque session est remplie
+        # déjà ordonnée, les sessions gardent leur ordre de première apparition.
+        # argsort NumPy sur les chaînes ISO : même ordre que sorted(), sans
+        # rappel Python par comparaison
+        session_keys = [f"{log.get('username', '')}_{log.get('client_ip', '')}" for log in logs]
+        user_sessions = {key: [] for key in session_keys}
+        timestamps = np.array([log.get('timestamp', '') for log in logs], dtype=str)
+        for i in np.argsort(timestamps, kind='stable').tolist():
+            user_sessions[session_keys[i]].append(i)
         
-        for session_key, session_logs in user_sessions.items():
-            if len(session_logs) < 3:
+        for session_key, sorted_indices in user_sessions.items():
+            if len(sorted_indices) < 3:
                 continue
             
-            sorted_logs = sorted(session_logs, key=lambda x: x.get('timestamp', ''))
-            
             attack_chain = []
-            for log in sorted_logs:
-                attacks = self.detect_attack_patterns(log)
+            for i in sorted_indices:
+                log = logs[i]
+                attacks = all_attacks[i] if all_attacks is not None else self.detect_attack_patterns(log)
                 if attacks:
                     attack_chain.append({
                         'timestamp': log.get('timestamp'),
@@ -341,8 +741,9 @@ class OracleAnomalyDetector:
     
     def generate_synthetic_dataset(self, output_path: str = "data/audit_logs_synthetic.csv"):
         """Génère un dataset synthétique de 70 logs (50 normaux + 20 suspects)"""
-        logs = []
         base_time = datetime.now()
+        # Même format que datetime.isoformat() (microsecondes omises si nulles)
+        iso_unit = 'us' if base_time.microsecond else 's'
         
         # 50 LOGS NORMAUX
         normal_actions = [
@@ -355,21 +756,24 @@ class OracleAnomalyDetector:
         
         normal_users = ["APP_USER", "REPORT_USER", "ETL_USER", "WEB_USER"]
         
-        for i in range(50):
-            sql, action, obj = normal_actions[i % len(normal_actions)]
-            user = normal_users[i % len(normal_users)]
-            timestamp = (base_time - timedelta(hours=i, minutes=i*3)).isoformat()
-            
-            logs.append({
-                'timestamp': timestamp,
-                'username': user,
-                'action': action,
-                'object_name': obj,
-                'sql_text': sql,
-                'client_ip': f"192.168.1.{100 + (i % 50)}",
-                'returncode': '0',
-                'session_id': f"SID{1000 + i}"
-            })
+        # Colonnes construites d'un bloc (pas de dict par ligne)
+        i = np.arange(50)
+        picked = np.array(normal_actions, dtype=object)[i % len(normal_actions)]
+        timestamps = (
+            np.datetime64(base_time, 'us')
+            - i.astype('timedelta64[h]')
+            - (3 * i).astype('timedelta64[m]')
+        )
+        normal_df = pd.DataFrame({
+            'timestamp': np.datetime_as_string(timestamps, unit=iso_unit),
+            'username': np.array(normal_users, dtype=object)[i % len(normal_users)],
+            'action': picked[:, 1],
+            'object_name': picked[:, 2],
+            'sql_text': picked[:, 0],
+            'client_ip': np.char.add('192.168.1.', (100 + i % 50).astype(str)),
+            'returncode': '0',
+            'session_id': np.char.add('SID', (1000 + i).astype(str))
+        })
         
         # 20 LOGS SUSPECTS
         malicious_logs = [
@@ -408,21 +812,18 @@ class OracleAnomalyDetector:
             {'sql_text': "SELECT * FROM dba_users WHERE account_status = 'OPEN'", 'action': "SELECT", 'object_name': "DBA_USERS", 'username': "ATTACKER"},
         ]
         
-        for i, mal_log in enumerate(malicious_logs):
-            timestamp = mal_log.get('timestamp', (base_time - timedelta(hours=i*2)).isoformat())
-            logs.append({
-                'timestamp': timestamp,
-                'username': mal_log['username'],
-                'action': mal_log['action'],
-                'object_name': mal_log['object_name'],
-                'sql_text': mal_log['sql_text'],
-                'client_ip': f"10.0.0.{50 + i}",
-                'returncode': mal_log.get('returncode', '0'),
-                'session_id': f"SID{2000 + i}"
-            })
+        j = np.arange(len(malicious_logs))
+        default_timestamps = np.datetime64(base_time, 'us') - (2 * j).astype('timedelta64[h]')
+        malicious_df = pd.DataFrame(malicious_logs)
+        malicious_df['timestamp'] = malicious_df['timestamp'].fillna(
+            pd.Series(np.datetime_as_string(default_timestamps, unit=iso_unit))
+        )
+        malicious_df['client_ip'] = np.char.add('10.0.0.', (50 + j).astype(str))
+        malicious_df['returncode'] = malicious_df['returncode'].fillna('0')
+        malicious_df['session_id'] = np.char.add('SID', (2000 + j).astype(str))
         
         # Sauvegarder en CSV
-        df = pd.DataFrame(logs)
+        df = pd.concat([normal_df, malicious_df[self.LOG_COLUMNS]], ignore_index=True)
         Path("data").mkdir(exist_ok=True)
         df.to_csv(output_path, index=False)
         
@@ -407,9 +407,9 @@ ALTER DATABASE OPEN;
             'criticality': criticality
         })
 
-        # Utilisation LLM pour recommandations backup
-        llm_recommendation = self.llm.generate(prompt=f"En tant qu'expert DBA ...")
-        llm_frequency = self.llm.generate(prompt=f"Quelle est la meilleure fréquence ...")
+        # Utilisation LLM pour recommandations backup (réponses en cache dans le LLM Engine)
+        llm_recommendation = self._get_llm_backup_recommendation(rpo, rto, budget, db_size, strategy)
+        llm_frequency = self._get_llm_backup_frequency(strategy, db_size, txn_hour)
 
         return {
             'timestamp': datetime.now().isoformat(),
@@ -459,6 +459,7 @@ Recommande des ajustements si nécessaire.
 Réponse concise en français."""
 
         try:
+            # Prompt identique -> réponse reprise du cache du LLM Engine
             return self.llm.generate(prompt, max_tokens=400)
         except Exception as e:
             return f"Erreur LLM: {e}"
@@ -533,7 +534,8 @@ def main():
     # Initialiser LLM Engine
     try:
         print("🤖 Initialisation LLM Engine...")
-        llm_engine = LLMEngine()
+        # Réponses conservées entre exécutions (correspondance exacte du prompt)
+        llm_engine = LLMEngine(cache_path="reports/llm_cache/backup_recommender.jsonl")
         print("   ✅ LLM Engine initialisé avec succès")
     except Exception as e:
         print(f"   ❌ Erreur LLM: {e}")
@@ -4,6 +4,7 @@ import streamlit as st
 from datetime import datetime
 from pathlib import Path
 import json
+import re
 import pandas as pd
 
 # ============================================================
@@ -16,31 +17,67 @@ def is_real_sql(text: str) -> bool:
 # ============================================================
 # CLASSIFICATION D'INTENTION SIMPLE
 # ============================================================
+# (intention, mots-clés) par ordre de priorité ; une alternation compilée par intention
+_INTENT_KEYWORDS = (
+    # Optimisation de requêtes
+    ("QUERY_OPTIMIZATION", ("optimiser", "lent", "performance", "slow", "query", "requête", "sql", "select", "index", "plan")),
+    # Audit sécurité
+    ("SECURITY_AUDIT", ("sécurité", "security", "audit", "vulnerabilité", "privileges", "roles", "permissions")),
+    # Détection d'anomalies
+    ("ANOMALY_DETECTION", ("anomalie", "anomaly", "détection", "detection", "intrusion", "attaque", "attack", "log", "audit")),
+    # Sauvegarde
+    ("BACKUP_STRATEGY", ("sauvegarde", "backup", "récupération", "recovery", "restore", "rétention", "retention")),
+    # Récupération/Restauration
+    ("RECOVERY_GUIDE", ("récupération", "recovery", "restauration", "restore", "crash", "disaster", "guide")),
+)
+_INTENT_RULES = tuple(
+    (intent, re.compile("|".join(map(re.escape, keywords))))
+    for intent, keywords in _INTENT_KEYWORDS
+)
+
+# Type de recommandation : un seul scan de la ligne, le groupe le plus prioritaire l'emporte
+_REC_TYPE_RE = re.compile(r'(index)|(statistiques|statistics|analyze)|(hint)')
+_REC_TYPES = (None, 'INDEX', 'STATISTIQUES', 'HINT')
+# Puces et numérotation en tête de ligne (les recommandations sont renumérotées)
+_BULLET_CHARS = ' \t\r•–-0123456789.)'
+
+
+def _recommendation_type(line_lower: str) -> str:
+    """INDEX > STATISTIQUES > HINT, REECRITURE par défaut"""
+    best = min((m.lastindex for m in _REC_TYPE_RE.finditer(line_lower)), default=None)
+    return _REC_TYPES[best] if best else 'REECRITURE'
+
+
+# ============================================================
+# PROMPTS ET CONTEXTE RAG
+# ============================================================
+# Les 3 analyses indépendantes d'une requête SQL ({sql} = requête de l'utilisateur)
+_SQL_ANALYSIS_PROMPTS = (
+    "Analysez cette requête SQL spécifique et expliquez comment Oracle l'exécuterait : {sql}\n"
+    "Décrivez étape par étape le plan d'exécution probable.",
+    "Identifiez les 3 opérations les plus coûteuses dans cette requête SQL spécifique : {sql}\n"
+    "Expliquez pourquoi chaque opération pourrait être lente et donner des métriques.",
+    "Donnez 3 recommandations d'optimisation spécifiques pour cette requête SQL : {sql}\n"
+    "Incluez des commandes SQL concrètes et le gain attendu pour chaque recommandation."
+)
+_SLOW_SELECT_PROMPT = "Explique pourquoi une requête Oracle SELECT peut être lente"
+_GENERAL_HELP_PROMPT = "Réponds brièvement à cette question Oracle : {question}"
+
+
+def _rag_context(rag, user_input: str) -> str:
+    """Top-3 des documents RAG joints en texte (jointure mise en cache côté RAG)"""
+    return rag.retrieve_context_text(user_input, n_results=3) if rag else ""
+
+
 def classify_intent_simple(user_input: str) -> str:
     """
     Classifie l'intention de l'utilisateur de manière simple basée sur des mots-clés.
     """
     text = user_input.lower()
 
-    # Optimisation de requêtes
-    if any(keyword in text for keyword in ["optimiser", "lent", "performance", "slow", "query", "requête", "sql", "select", "index", "plan"]):
-        return "QUERY_OPTIMIZATION"
-
-    # Audit sécurité
-    if any(keyword in text for keyword in ["sécurité", "security", "audit", "vulnerabilité", "privileges", "roles", "permissions"]):
-        return "SECURITY_AUDIT"
-
-    # Détection d'anomalies
-    if any(keyword in text for keyword in ["anomalie", "anomaly", "détection", "detection", "intrusion", "attaque", "attack", "log", "audit"]):
-        return "ANOMALY_DETECTION"
-
-    # Sauvegarde
-    if any(keyword in text for keyword in ["sauvegarde", "backup", "récupération", "recovery", "restore", "rétention", "retention"]):
-        return "BACKUP_STRATEGY"
-
-    # Récupération/Restauration
-    if any(keyword in text for keyword in ["récupération", "recovery", "restauration", "restore", "crash", "disaster", "guide"]):
-        return "RECOVERY_GUIDE"
+    for intent, pattern in _INTENT_RULES:
+        if pattern.search(text):
+            return intent
 
     # Par défaut : aide générale
     return "GENERAL_HELP"
@@ -144,45 +181,23 @@ def handle_query_optimization(user_input, modules, llm, rag):
         }
 
         # Use RAG context for SQL analysis
-        vector_results = rag.retrieve_context(user_input, n_results=3) if rag else []
-        context_text = "\n".join([str(r) for r in vector_results]) if vector_results else ""
+        context_text = _rag_context(rag, user_input)
         
-        # CORRECTION ICI : Utiliser generate() au lieu de query_with_vector_context()
-        explication_plan = llm.generate(
-            f"Analysez cette requête SQL spécifique et expliquez comment Oracle l'exécuterait : {user_input}\n"
-            "Décrivez étape par étape le plan d'exécution probable.",
-            context=context_text
-        )
-
-        points_couteux = llm.generate(
-            f"Identifiez les 3 opérations les plus coûteuses dans cette requête SQL spécifique : {user_input}\n"
-            "Expliquez pourquoi chaque opération pourrait être lente et donner des métriques.",
-            context=context_text
-        )
-
-        suggestions = llm.generate(
-            f"Donnez 3 recommandations d'optimisation spécifiques pour cette requête SQL : {user_input}\n"
-            "Incluez des commandes SQL concrètes et le gain attendu pour chaque recommandation.",
-            context=context_text
+        # Les 3 analyses sont indépendantes : envoyées en parallèle en un seul batch
+        explication_plan, points_couteux, suggestions = llm.batch(
+            [template.format(sql=user_input) for template in _SQL_ANALYSIS_PROMPTS],
+            contexts=[context_text] * 3
         )
 
         # Parse suggestions into structured recommendations
         recommandations = []
-        for i, line in enumerate(suggestions.split('\n')[:3], 1):
-            line = line.strip()
+        # Only the first 3 lines are used: don't split the whole response
+        for line in suggestions.split('\n', 3)[:3]:
+            line = line.lstrip(_BULLET_CHARS).rstrip()
             if line and len(line) > 10:  # Filter out empty/short lines
-                # Determine recommendation type based on content
-                rec_type = 'REECRITURE'
-                if 'index' in line.lower() or 'create index' in line.lower():
-                    rec_type = 'INDEX'
-                elif 'statistiques' in line.lower() or 'statistics' in line.lower() or 'analyze' in line.lower():
-                    rec_type = 'STATISTIQUES'
-                elif 'hint' in line.lower():
-                    rec_type = 'HINT'
-
                 recommandations.append({
                     'description': line,
-                    'type': rec_type
+                    'type': _recommendation_type(line.lower())
                 })
 
         # Fallback: if we don't have enough recommendations, try the optimizer
@@ -209,14 +224,10 @@ def handle_query_optimization(user_input, modules, llm, rag):
 """
 
     # Cas 2 : question générale
-    vector_results = rag.retrieve_context(user_input, n_results=3) if rag else []
-    context_text = "\n".join([str(r) for r in vector_results]) if vector_results else ""
+    context_text = _rag_context(rag, user_input)
     
     # CORRECTION ICI
-    explanation = llm.generate(
-        "Explique pourquoi une requête Oracle SELECT peut être lente",
-        context=context_text
-    )
+    explanation = llm.generate(_SLOW_SELECT_PROMPT, context=context_text)
 
     return f"""
 ⚡ **Pourquoi une requête SELECT peut être lente ?**
@@ -259,8 +270,7 @@ def handle_anomaly_detection(modules):
     logs = detector.load_audit_logs_from_csv("data/audit_logs_synthetic.csv")
     anomalies = []
 
-    for log in logs[:10]:  # Analyze first 10 logs for demo
-        result = detector.analyze_log_entry(log)
+    for result in detector.analyze_logs(logs[:10]):  # Analyze first 10 logs for demo
         if result['classification'] in ['CRITIQUE', 'SUSPECT']:
             anomalies.append(result)
 
@@ -344,14 +354,10 @@ def handle_recovery(user_input, modules):
 # GÉNÉRAL
 # ============================================================
 def handle_general_help(user_input, llm, rag=None):
-    vector_results = rag.retrieve_context(user_input, n_results=3) if rag else []
-    context_text = "\n".join([str(r) for r in vector_results]) if vector_results else ""
+    context_text = _rag_context(rag, user_input)
     
     # CORRECTION ICI
-    answer = llm.generate(
-        f"Réponds brièvement à cette question Oracle : {user_input}",
-        context=context_text
-    )
+    answer = llm.generate(_GENERAL_HELP_PROMPT.format(question=user_input), context=context_text)
     return f"💡 {answer}"
 
 # ============================================================
@@ -5,6 +5,7 @@ import sys
 from pathlib import Path
 import os
 import time
+import threading
 
 # ============================================================
 # CONFIGURATION DES CHEMINS - VERSION CORRIGÉE
@@ -71,6 +72,8 @@ def initialize_all_modules():
 
             print("      → Chargement LLM Engine...")
             llm_engine = LLMEngine(model="meta-llama/llama-4-scout-17b-16e-instruct")
+            # Connexion HTTPS ouverte en arrière-plan pendant le chargement des autres modules
+            threading.Thread(target=llm_engine.warm_up, daemon=True).start()
             print("      → LLM Engine chargé")
 
             modules_initialized['llm_engine'] = llm_engine
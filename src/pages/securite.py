@@ -4,6 +4,11 @@ import pandas as pd
 import json
 from pathlib import Path
 
+try:
+    import ahocorasick  # pyahocorasick : scan multi-motifs en une passe
+except ImportError:
+    ahocorasick = None
+
 def show():
     st.title("🔒 Module Sécurité")
 
@@ -333,49 +338,62 @@ Configuration analysée:
                     perform_basic_security_analysis(config_text)
 
 
+# Règles de l'analyse basique : (mot-clé recherché, risque signalé)
+_BASIC_SECURITY_RULES = (
+    ("DBA", {
+        "severity": "CRITIQUE",
+        "title": "Rôle DBA sur compte applicatif",
+        "description": "Un compte applicatif possède le rôle DBA",
+        "action": "Créer un rôle spécifique avec privilèges minimaux"
+    }),
+    ("ANY TABLE", {
+        "severity": "HAUTE",
+        "title": "Privilèges ANY TABLE excessifs",
+        "description": "Privilèges système trop permissifs",
+        "action": "Remplacer par des privilèges spécifiques au schéma"
+    }),
+    ("DEFAULT", {
+        "severity": "MOYENNE",
+        "title": "Profil de sécurité par défaut",
+        "description": "Utilisation du profil DEFAULT non personnalisé",
+        "action": "Créer un profil de sécurité personnalisé"
+    }),
+)
+# Pénalité par sévérité (10 pour toute autre sévérité)
+_SEVERITY_PENALTY = {"CRITIQUE": 40, "HAUTE": 20}
+
+
+def _build_rule_automaton():
+    """Automate Aho-Corasick des mots-clés des règles (None sans pyahocorasick)"""
+    if ahocorasick is None:
+        return None
+    automaton = ahocorasick.Automaton()
+    for needle, _ in _BASIC_SECURITY_RULES:
+        automaton.add_word(needle, needle)
+    automaton.make_automaton()
+    return automaton
+
+
+_RULE_AUTOMATON = _build_rule_automaton()
+
+
 def perform_basic_security_analysis(config_text):
     """Analyse basique de sécurité sans IA"""
 
     st.success("✅ Analyse basique terminée!")
 
-    # Analyse simple basée sur des mots-clés
-    risks_found = []
-
-    if "DBA" in config_text.upper():
-        risks_found.append({
-            "severity": "CRITIQUE",
-            "title": "Rôle DBA sur compte applicatif",
-            "description": "Un compte applicatif possède le rôle DBA",
-            "action": "Créer un rôle spécifique avec privilèges minimaux"
-        })
-
-    if "ANY TABLE" in config_text.upper():
-        risks_found.append({
-            "severity": "HAUTE",
-            "title": "Privilèges ANY TABLE excessifs",
-            "description": "Privilèges système trop permissifs",
-            "action": "Remplacer par des privilèges spécifiques au schéma"
-        })
-
-    if "DEFAULT" in config_text.upper():
-        risks_found.append({
-            "severity": "MOYENNE",
-            "title": "Profil de sécurité par défaut",
-            "description": "Utilisation du profil DEFAULT non personnalisé",
-            "action": "Créer un profil de sécurité personnalisé"
-        })
+    # Analyse simple basée sur des mots-clés (texte mis en majuscules une seule fois)
+    config_upper = config_text.upper()
+    if _RULE_AUTOMATON is not None:
+        # Un seul passage sur le texte, quel que soit le nombre de règles
+        found = {needle for _, needle in _RULE_AUTOMATON.iter(config_upper)}
+        risks_found = [risk for needle, risk in _BASIC_SECURITY_RULES if needle in found]
+    else:
+        risks_found = [risk for needle, risk in _BASIC_SECURITY_RULES if needle in config_upper]
 
     # Calcul du score
-    base_score = 100
-    for risk in risks_found:
-        if risk["severity"] == "CRITIQUE":
-            base_score -= 40
-        elif risk["severity"] == "HAUTE":
-            base_score -= 20
-        else:
-            base_score -= 10
-
-    final_score = max(0, base_score)
+    penalties = sum(_SEVERITY_PENALTY.get(risk["severity"], 10) for risk in risks_found)
+    final_score = max(0, 100 - penalties)
 
     col1, col2 = st.columns(2)
     with col1:
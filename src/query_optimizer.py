@@ -26,6 +26,10 @@ except ImportError as e:
     print(f"⚠️  LLMEngine non disponible: {e}")
     LLM_AVAILABLE = False
 
+# Mots-clés marquant le début d'une recommandation (un seul passage regex par ligne)
+_REC_START_RE = re.compile(r'INDEX|REECRITURE|HINT|STATISTIQUES|CREATE|ADD|MODIFY')
+_MAX_RECOMMANDATIONS = 3
+
 class OracleQueryOptimizerLLM:
     """Optimiseur Oracle avec intégration LLM"""
     
@@ -118,10 +122,11 @@ class OracleQueryOptimizerLLM:
 
         if self.llm:
             try:
-                # Utiliser les méthodes spécialisées du LLM
-                explication_plan = self.llm.explain_plan(plan_data)
-                costly_operations = self.llm.identify_costly_operations(plan_data)
-                suggestions_text = self.llm.suggest_optimizations(sql_text, plan_data)
+                # Un seul appel LLM pour l'explication, les points coûteux et les suggestions
+                analysis = self.llm.analyze_plan_combo(sql_text, plan_data)
+                explication_plan = analysis['explain']
+                costly_operations = analysis['costly']
+                suggestions_text = analysis['suggest']
 
                 # Parser les suggestions en recommandations structurées
                 recommandations = self._parse_suggestions_to_recommendations(suggestions_text)
@@ -234,39 +239,43 @@ class OracleQueryOptimizerLLM:
         if not suggestions_text or suggestions_text.startswith("Error"):
             return recommandations
 
-        # Diviser les suggestions en lignes
+        # Diviser les suggestions en lignes (majuscules calculées une seule fois
+        # sur tout le texte ; seuls des tests d'inclusion y sont faits)
         lines = suggestions_text.split('\n')
+        upper_lines = suggestions_text.upper().split('\n')
         current_rec = None
         rec_id = 1
 
-        for line in lines:
+        for line, upper in zip(lines, upper_lines):
             line = line.strip()
             if not line:
                 continue
 
             # Détecter le début d'une nouvelle recommandation
-            if any(keyword in line.upper() for keyword in ['INDEX', 'REECRITURE', 'HINT', 'STATISTIQUES', 'CREATE', 'ADD', 'MODIFY']):
+            if _REC_START_RE.search(upper):
                 # Sauvegarder la précédente si elle existe
                 if current_rec:
                     recommandations.append(current_rec)
+                    current_rec = None
+                    # Les suivantes seraient de toute façon écartées
+                    if len(recommandations) >= _MAX_RECOMMANDATIONS:
+                        break
 
                 # Déterminer le type
-                if 'INDEX' in line.upper() or 'CREATE INDEX' in line.upper():
+                if 'INDEX' in upper:
                     rec_type = 'INDEX'
-                elif 'REECRITURE' in line.upper() or 'REWRITE' in line.upper() or 'SELECT' in line.upper():
+                elif 'REECRITURE' in upper or 'REWRITE' in upper or 'SELECT' in upper:
                     rec_type = 'REECRITURE'
-                elif 'HINT' in line.upper():
+                elif 'HINT' in upper:
                     rec_type = 'HINT'
-                elif 'STATISTIQUES' in line.upper() or 'STATISTICS' in line.upper() or 'GATHER' in line.upper():
+                elif 'STATISTIQUES' in upper or 'STATISTICS' in upper or 'GATHER' in upper:
                     rec_type = 'STATISTIQUES'
                 else:
                     rec_type = 'REECRITURE'
 
                 # Extraire la commande SQL si présente
                 sql_command = ""
-                if 'CREATE' in line.upper() or 'EXEC' in line.upper() or 'ALTER' in line.upper():
-                    sql_command = line
-                elif 'SELECT' in line.upper():
+                if 'CREATE' in upper or 'EXEC' in upper or 'ALTER' in upper or 'SELECT' in upper:
                     sql_command = line
 
                 current_rec = {
@@ -280,7 +289,7 @@ class OracleQueryOptimizerLLM:
 
             elif current_rec:
                 # Ajouter à la description ou commande existante
-                if not current_rec['sql_command'] and ('CREATE' in line.upper() or 'EXEC' in line.upper()):
+                if not current_rec['sql_command'] and ('CREATE' in upper or 'EXEC' in upper):
                     current_rec['sql_command'] = line
                 else:
                     current_rec['description'] += f" {line}"
@@ -290,7 +299,7 @@ class OracleQueryOptimizerLLM:
             recommandations.append(current_rec)
 
         # Limiter à 3 recommandations maximum
-        return recommandations[:3]
+        return recommandations[:_MAX_RECOMMANDATIONS]
 
 
 def initialize_llm() -> Optional[LLMEngine]:
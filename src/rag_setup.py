@@ -8,6 +8,7 @@ MODULE 2 : RAG & Vector Database Setup avec PINECONE (VERSION ULTIME)
 ✅ Paramètres optimisés (300 pages, 300 chars, 5000 metadata)
 """
 
+import copy
 import os
 import time
 import re
@@ -87,6 +88,11 @@ class OracleRAGSetup:
             "skipped_duplicates": 0,
             "total_chars": 0
         }
+        
+        # Cache des recherches (embedding + requête Pinecone) : clé -> (horodatage, résultats)
+        self.cache_ttl = 600  # secondes
+        self.cache_size = 256
+        self._retrieval_cache: Dict[str, tuple] = {}
     
     def _setup_index(self):
         """Créer ou récupérer l'index Pinecone"""
@@ -310,6 +316,7 @@ class OracleRAGSetup:
                 print(f"         → Batch {batch_num}/{total_batches}")
         
         print(f"   ✅ '{title}' ajouté ({len(chunks)} chunks)")
+        self._retrieval_cache.clear()
         
         if file_path:
             self._mark_document_processed(file_path)
@@ -399,6 +406,43 @@ class OracleRAGSetup:
         print(f"{'='*75}\n")
     
     def retrieve_context(self, query: str, n_results: int = 5, min_score: float = 0.3) -> List[Dict]:
+        """Recherche vectorielle (résultats mis en cache cache_ttl secondes, copies renvoyées à l'appelant)"""
+        key = hashlib.blake2b(f"{n_results}|{min_score}|{query}".encode('utf-8'), digest_size=16).hexdigest()
+        hit = self._retrieval_cache.get(key)
+        if hit and time.monotonic() - hit[0] < self.cache_ttl:
+            return copy.deepcopy(hit[1])
+        
+        context_docs = self._query_index(query, n_results, min_score)
+        
+        self._retrieval_cache.pop(key, None)
+        if len(self._retrieval_cache) >= self.cache_size:
+            self._retrieval_cache.pop(next(iter(self._retrieval_cache)))
+        self._retrieval_cache[key] = (time.monotonic(), context_docs)
+        return copy.deepcopy(context_docs)
+    
+    def retrieve_context_text(self, query: str, n_results: int = 5, min_score: float = 0.3,
+                              max_chars: int = 500) -> str:
+        """Contexte prêt à injecter dans un prompt : extraits tronqués à max_chars, un par ligne (mis en cache)"""
+        key = hashlib.blake2b(f"txt|{max_chars}|{n_results}|{min_score}|{query}".encode('utf-8'),
+                              digest_size=16).hexdigest()
+        hit = self._retrieval_cache.get(key)
+        if hit and time.monotonic() - hit[0] < self.cache_ttl:
+            return hit[1]
+        
+        parts = []
+        for doc in self.retrieve_context(query, n_results=n_results, min_score=min_score):
+            content = doc['content']
+            parts.append(content if len(content) <= max_chars else content[:max_chars])
+        text = "\n".join(parts)
+        
+        self._retrieval_cache.pop(key, None)
+        if len(self._retrieval_cache) >= self.cache_size:
+            self._retrieval_cache.pop(next(iter(self._retrieval_cache)))
+        self._retrieval_cache[key] = (time.monotonic(), text)
+        return text
+    
+    def _query_index(self, query: str, n_results: int, min_score: float) -> List[Dict]:
+        """Recherche vectorielle sans cache"""
         stats = self.index.describe_index_stats()
         ns_stats = stats.get('namespaces', {}).get(self.namespace, {})
         if ns_stats.get('vector_count', 0) == 0:
@@ -439,6 +483,7 @@ class OracleRAGSetup:
         print(f"\n⚠️  Suppression namespace '{self.namespace}'...")
         try:
             self.index.delete(delete_all=True, namespace=self.namespace)
+            self._retrieval_cache.clear()
             print(f"✅ Namespace '{self.namespace}' vidé")
             
             if self.dedup_file.exists():
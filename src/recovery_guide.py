@@ -5,6 +5,140 @@ from typing import Dict, Any, Optional
 from datetime import datetime
 from llm_engine import LLMEngine
 
+# Motifs du parseur de playbook, compilés une seule fois (appliqués à la ligne en minuscules)
+_STEP_NUM_RE = re.compile(r'^\d+[\.\)]\s*')
+_STEP_RE = re.compile(r'étape|step')
+_COMMAND_RE = re.compile(r'rman>|sql>|flashback|create |alter |recover|restore')
+_VALIDATION_RE = re.compile(r'vérifier|valider|vérification|validation')
+_TIME_HINT_RE = re.compile(r'temps|durée|time|estimated')
+_TIME_RE = re.compile(r'(\d+[-\s]*\d*\s*(heures?|minutes?|jours?|hours?|minutes?|days?))', re.IGNORECASE)
+_BULLET_CHARS = ' \t\r•–-'  # puces et espaces en tête de ligne
+# Éléments gardés dans un playbook (collecte arrêtée une fois le plafond atteint)
+_MAX_STEPS = 10
+_MAX_COMMANDS = 10
+_MAX_VALIDATION_POINTS = 5
+
+# Tables des scénarios, construites une seule fois à l'import
+# Mots-clés pour chaque scénario (AMÉLIORÉS)
+_SCENARIO_KEYWORDS = {
+    'full_recovery': [
+        'crash', 'plantage', 'base perdue', 'base crashée',
+        'rman restore', 'restauration complète', 'récupération complète',
+        'base corrompue', 'media failure', 'perte totale', 'tout restaurer',
+        'base entière', 'instance down', 'instance arrêtée'
+    ],
+    'pitr': [
+        'point in time', 'point-in-time', 'p.i.t.r', 'pitr',
+        'restaurer jusqu\'à', 'récupérer jusqu\'à', 'à une date',
+        'heure spécifique', 'scn', 'restaurer au', 'récupérer au',
+        'rollback time', 'mars', 'avril', 'mai', 'juin', 'juillet',  # Mois
+        'janvier', 'février', 'août', 'septembre', 'octobre', 'novembre', 'décembre',
+        '14h', '15h', '16h', '17h', 'heure', 'h ', 'h:',  # Heures
+        '2024', '2025', '2026',  # Années
+        'date', 'moment précis', 'point précis'
+    ],
+    'table_recovery': [
+        'table', 'table supprimée', 'table effacée', 'table perdue',
+        'restaurer table', 'récupérer table', 'drop table', 'truncate table',
+        'accidentellement supprimé', 'restore table', 'recover table',
+        'employees', 'clients', 'produits',  # Noms de tables courants
+        'objet supprimé', 'objet perdu'
+    ],
+    'row_recovery': [
+        'ligne', 'lignes', 'données spécifiques', 'donnée particulière',
+        'récupérer des lignes', 'restaurer des lignes', 'flashback query',
+        'as of timestamp', 'anciennes données', 'valeur précédente',
+        'annuler modification', 'rollback data', 'modification erronée',
+        'données modifiées', 'données effacées'
+    ]
+}
+# Points supplémentaires pour les mots-clés forts (1 par défaut)
+_KEYWORD_WEIGHTS = {'pitr': 3, 'point in time': 3, 'scn': 3, 'table': 2, 'ligne': 2, 'crash': 2}
+
+_CLARIFICATION_QUESTIONS = {
+    'full_recovery': [
+        "Avez-vous les backups RMAN récents ?",
+        "Où sont stockés les fichiers de backup ? (disque, bande)",
+        "L'instance Oracle est-elle encore en fonctionnement ?",
+        "Avez-vous les fichiers de contrôle (controlfiles) ?",
+        "Quelle est la version de la base de données ?"
+    ],
+    'pitr': [
+        "Quelle est la date/heure exacte cible ? (format: JJ-MM-AAAA HH24:MI:SS)",
+        "Connaissez-vous le SCN (System Change Number) cible ?",
+        "Avez-vous tous les archive logs depuis le dernier backup ?",
+        "Le backup a-t-il été fait avant la date cible ?",
+        "Quelle est la raison de la récupération PITR ?"
+    ],
+    'table_recovery': [
+        "Quel est le nom exact de la table à récupérer ?",
+        "Quand a-t-elle été supprimée/modifiée ?",
+        "Dans quel schéma se trouve cette table ?",
+        "Avez-vous activé FLASHBACK TABLE ?",
+        "Quelle est la taille approximative de la table ?"
+    ],
+    'row_recovery': [
+        "Quelle table contient les données à récupérer ?",
+        "Quand les données ont-elles été modifiées/supprimées ?",
+        "Avez-vous besoin de récupérer toutes les lignes ou certaines spécifiques ?",
+        "Connaissez-vous les anciennes valeurs ?",
+        "Avez-vous activé UNDO_RETENTION avec une valeur suffisante ?"
+    ]
+}
+
+_DEFAULT_STEPS = {
+    'full_recovery': [
+        "Vérifier la disponibilité des backups RMAN",
+        "Démarrer l'instance en mode NOMOUNT",
+        "Restaurer le fichier de contrôle (controlfile)",
+        "Monter la base de données",
+        "Restaurer les fichiers de données",
+        "Appliquer les archive logs",
+        "Ouvrir la base avec RESETLOGS"
+    ],
+    'pitr': [
+        "Déterminer le SCN ou timestamp cible",
+        "Vérifier la disponibilité des archive logs",
+        "Lancer la commande RMAN avec SET UNTIL",
+        "Restaurer la base",
+        "Appliquer les logs jusqu'au point cible",
+        "Ouvrir avec RESETLOGS"
+    ],
+    'table_recovery': [
+        "Vérifier si FLASHBACK TABLE est activé",
+        "Essayer FLASHBACK TABLE TO BEFORE DROP",
+        "Sinon, utiliser TSPITR via RMAN",
+        "Récupérer la table depuis backup",
+        "Valider l'intégrité des données"
+    ]
+}
+
+_DEFAULT_COMMANDS = {
+    'full_recovery': [
+        "RMAN> STARTUP NOMOUNT;",
+        "RMAN> RESTORE CONTROLFILE FROM AUTOBACKUP;",
+        "RMAN> ALTER DATABASE MOUNT;",
+        "RMAN> RESTORE DATABASE;",
+        "RMAN> RECOVER DATABASE;",
+        "RMAN> ALTER DATABASE OPEN RESETLOGS;"
+    ],
+    'pitr': [
+        "RMAN> RUN {",
+        "  SET UNTIL TIME \"TO_DATE('15-MAR-2024 14:30:00', 'DD-MON-YYYY HH24:MI:SS')\";",
+        "  RESTORE DATABASE;",
+        "  RECOVER DATABASE;",
+        "  ALTER DATABASE OPEN RESETLOGS;",
+        "}"
+    ]
+}
+
+_DEFAULT_TIMES = {
+    'full_recovery': "2-6 heures",
+    'pitr': "1-4 heures",
+    'table_recovery': "15-60 minutes",
+    'row_recovery': "5-30 minutes"
+}
+
 class OracleRecoveryGuide:
     """
     Module 8: Restauration & Récupération Assistée
@@ -80,54 +214,12 @@ class OracleRecoveryGuide:
         """
         question_lower = user_question.lower()
         
-        # Mots-clés pour chaque scénario (AMÉLIORÉS)
-        scenario_keywords = {
-            'full_recovery': [
-                'crash', 'plantage', 'base perdue', 'base crashée',
-                'rman restore', 'restauration complète', 'récupération complète',
-                'base corrompue', 'media failure', 'perte totale', 'tout restaurer',
-                'base entière', 'instance down', 'instance arrêtée'
-            ],
-            'pitr': [
-                'point in time', 'point-in-time', 'p.i.t.r', 'pitr',
-                'restaurer jusqu\'à', 'récupérer jusqu\'à', 'à une date',
-                'heure spécifique', 'scn', 'restaurer au', 'récupérer au',
-                'rollback time', 'mars', 'avril', 'mai', 'juin', 'juillet',  # Mois
-                'janvier', 'février', 'août', 'septembre', 'octobre', 'novembre', 'décembre',
-                '14h', '15h', '16h', '17h', 'heure', 'h ', 'h:',  # Heures
-                '2024', '2025', '2026',  # Années
-                'date', 'moment précis', 'point précis'
-            ],
-            'table_recovery': [
-                'table', 'table supprimée', 'table effacée', 'table perdue',
-                'restaurer table', 'récupérer table', 'drop table', 'truncate table',
-                'accidentellement supprimé', 'restore table', 'recover table',
-                'employees', 'clients', 'produits',  # Noms de tables courants
-                'objet supprimé', 'objet perdu'
-            ],
-            'row_recovery': [
-                'ligne', 'lignes', 'données spécifiques', 'donnée particulière',
-                'récupérer des lignes', 'restaurer des lignes', 'flashback query',
-                'as of timestamp', 'anciennes données', 'valeur précédente',
-                'annuler modification', 'rollback data', 'modification erronée',
-                'données modifiées', 'données effacées'
-            ]
-        }
-        
         # Compter les correspondances pour chaque scénario
         scores = {}
-        for scenario, keywords in scenario_keywords.items():
-            score = 0
-            for keyword in keywords:
-                if keyword in question_lower:
-                    # Points supplémentaires pour les mots-clés forts
-                    if keyword in ['pitr', 'point in time', 'scn']:
-                        score += 3
-                    elif keyword in ['table', 'ligne', 'crash']:
-                        score += 2
-                    else:
-                        score += 1
-            scores[scenario] = score
+        for scenario, keywords in _SCENARIO_KEYWORDS.items():
+            scores[scenario] = sum(
+                _KEYWORD_WEIGHTS.get(keyword, 1) for keyword in keywords if keyword in question_lower
+            )
         
         # DEBUG: Afficher les scores
         debug = False  # Mettre à True pour debug
@@ -148,38 +240,7 @@ class OracleRecoveryGuide:
         """
         Retourne les questions de clarification pour chaque scénario
         """
-        questions_map = {
-            'full_recovery': [
-                "Avez-vous les backups RMAN récents ?",
-                "Où sont stockés les fichiers de backup ? (disque, bande)",
-                "L'instance Oracle est-elle encore en fonctionnement ?",
-                "Avez-vous les fichiers de contrôle (controlfiles) ?",
-                "Quelle est la version de la base de données ?"
-            ],
-            'pitr': [
-                "Quelle est la date/heure exacte cible ? (format: JJ-MM-AAAA HH24:MI:SS)",
-                "Connaissez-vous le SCN (System Change Number) cible ?",
-                "Avez-vous tous les archive logs depuis le dernier backup ?",
-                "Le backup a-t-il été fait avant la date cible ?",
-                "Quelle est la raison de la récupération PITR ?"
-            ],
-            'table_recovery': [
-                "Quel est le nom exact de la table à récupérer ?",
-                "Quand a-t-elle été supprimée/modifiée ?",
-                "Dans quel schéma se trouve cette table ?",
-                "Avez-vous activé FLASHBACK TABLE ?",
-                "Quelle est la taille approximative de la table ?"
-            ],
-            'row_recovery': [
-                "Quelle table contient les données à récupérer ?",
-                "Quand les données ont-elles été modifiées/supprimées ?",
-                "Avez-vous besoin de récupérer toutes les lignes ou certaines spécifiques ?",
-                "Connaissez-vous les anciennes valeurs ?",
-                "Avez-vous activé UNDO_RETENTION avec une valeur suffisante ?"
-            ]
-        }
-        
-        return questions_map.get(scenario, [])
+        return list(_CLARIFICATION_QUESTIONS.get(scenario, []))
     
     def _format_llm_response(self, response: str, scenario: str) -> Dict[str, Any]:
         """
@@ -196,42 +257,29 @@ class OracleRecoveryGuide:
         validation_points = []
         estimated_time = None
         
-        # Parser la réponse pour trouver les éléments
+        # Parser la réponse pour trouver les éléments : minuscules en une passe
+        # sur tout le texte (les recherches ci-dessous ignorent les espaces)
         lines = cleaned.split('\n')
+        lower_lines = cleaned.lower().split('\n')
         
-        for line in lines:
-            line_clean = line.strip()
+        for line, line_lower in zip(lines, lower_lines):
+            line_clean = line.lstrip(_BULLET_CHARS).rstrip()
             
             # Détecter les étapes numérotées
-            if (re.match(r'^\d+[\.\)]', line_clean) or 
-                'étape' in line_clean.lower() or
-                'step' in line_clean.lower()):
+            if len(steps) < _MAX_STEPS and (_STEP_NUM_RE.match(line_clean) or _STEP_RE.search(line_lower)):
                 steps.append(line_clean)
             
             # Détecter les commandes RMAN
-            if ('rman>' in line_clean.lower() or 
-                'sql>' in line_clean.lower() or
-                'flashback' in line_clean.lower() or
-                'create ' in line_clean.lower() or
-                'alter ' in line_clean.lower() or
-                'recover' in line_clean.lower() or
-                'restore' in line_clean.lower()):
+            if len(commands) < _MAX_COMMANDS and _COMMAND_RE.search(line_lower):
                 commands.append(line_clean)
             
             # Détecter les points de validation
-            if ('vérifier' in line_clean.lower() or 
-                'valider' in line_clean.lower() or
-                'vérification' in line_clean.lower() or
-                'validation' in line_clean.lower()):
+            if len(validation_points) < _MAX_VALIDATION_POINTS and _VALIDATION_RE.search(line_lower):
                 validation_points.append(line_clean)
             
             # Détecter le temps estimé
-            if ('temps' in line_clean.lower() or 
-                'durée' in line_clean.lower() or
-                'time' in line_clean.lower() or
-                'estimated' in line_clean.lower()):
-                time_match = re.search(r'(\d+[-\s]*\d*\s*(heures?|minutes?|jours?|hours?|minutes?|days?))', 
-                                      line_clean, re.IGNORECASE)
+            if _TIME_HINT_RE.search(line_lower):
+                time_match = _TIME_RE.search(line_clean)
                 if time_match:
                     estimated_time = time_match.group(1)
         
@@ -248,20 +296,20 @@ class OracleRecoveryGuide:
         # Structurer le playbook
         playbook = {
             'steps': [],
-            'commands': commands[:10],
-            'validation_points': validation_points[:5],
+            'commands': commands[:_MAX_COMMANDS],
+            'validation_points': validation_points[:_MAX_VALIDATION_POINTS],
             'estimated_time': estimated_time,
             'raw_response': cleaned[:500],  # Garder un extrait
             'structured': len(steps) > 1  # Indique si bien structuré
         }
         
         # Formater les étapes
-        for i, step in enumerate(steps[:10], 1):
+        for i, step in enumerate(steps[:_MAX_STEPS], 1):
             if isinstance(step, dict):
                 playbook['steps'].append(step)
             else:
                 # Nettoyer le numéro si présent
-                clean_step = re.sub(r'^\d+[\.\)]\s*', '', step)
+                clean_step = _STEP_NUM_RE.sub('', step)
                 playbook['steps'].append({
                     'number': i,
                     'description': clean_step[:200]
@@ -271,65 +319,15 @@ class OracleRecoveryGuide:
     
     def _get_default_steps(self, scenario: str) -> list:
         """Étapes par défaut selon le scénario"""
-        defaults = {
-            'full_recovery': [
-                "Vérifier la disponibilité des backups RMAN",
-                "Démarrer l'instance en mode NOMOUNT",
-                "Restaurer le fichier de contrôle (controlfile)",
-                "Monter la base de données",
-                "Restaurer les fichiers de données",
-                "Appliquer les archive logs",
-                "Ouvrir la base avec RESETLOGS"
-            ],
-            'pitr': [
-                "Déterminer le SCN ou timestamp cible",
-                "Vérifier la disponibilité des archive logs",
-                "Lancer la commande RMAN avec SET UNTIL",
-                "Restaurer la base",
-                "Appliquer les logs jusqu'au point cible",
-                "Ouvrir avec RESETLOGS"
-            ],
-            'table_recovery': [
-                "Vérifier si FLASHBACK TABLE est activé",
-                "Essayer FLASHBACK TABLE TO BEFORE DROP",
-                "Sinon, utiliser TSPITR via RMAN",
-                "Récupérer la table depuis backup",
-                "Valider l'intégrité des données"
-            ]
-        }
-        return defaults.get(scenario, ["Analyser la situation", "Suivre procédure Oracle"])
+        return _DEFAULT_STEPS.get(scenario, ["Analyser la situation", "Suivre procédure Oracle"])
     
     def _get_default_commands(self, scenario: str) -> list:
         """Commandes par défaut"""
-        defaults = {
-            'full_recovery': [
-                "RMAN> STARTUP NOMOUNT;",
-                "RMAN> RESTORE CONTROLFILE FROM AUTOBACKUP;",
-                "RMAN> ALTER DATABASE MOUNT;",
-                "RMAN> RESTORE DATABASE;",
-                "RMAN> RECOVER DATABASE;",
-                "RMAN> ALTER DATABASE OPEN RESETLOGS;"
-            ],
-            'pitr': [
-                "RMAN> RUN {",
-                "  SET UNTIL TIME \"TO_DATE('15-MAR-2024 14:30:00', 'DD-MON-YYYY HH24:MI:SS')\";",
-                "  RESTORE DATABASE;",
-                "  RECOVER DATABASE;",
-                "  ALTER DATABASE OPEN RESETLOGS;",
-                "}"
-            ]
-        }
-        return defaults.get(scenario, ["-- Commandes spécifiques au scénario"])
+        return _DEFAULT_COMMANDS.get(scenario, ["-- Commandes spécifiques au scénario"])
     
     def _get_default_time(self, scenario: str) -> str:
         """Temps estimé par défaut"""
-        times = {
-            'full_recovery': "2-6 heures",
-            'pitr': "1-4 heures",
-            'table_recovery': "15-60 minutes",
-            'row_recovery': "5-30 minutes"
-        }
-        return times.get(scenario, "Variable")
+        return _DEFAULT_TIMES.get(scenario, "Variable")
     
     def generate_recovery_guide(self, scenario: str, user_inputs: Dict[str, str]) -> Dict[str, Any]:
         """
@@ -387,14 +385,15 @@ class OracleRecoveryGuide:
                 context = "Tu es un expert DBA Oracle français. Réponds exclusivement en français."
 
                 # Ajouter contexte RAG si disponible
-                if self.rag and hasattr(self.rag, 'retrieve_context'):
+                if self.rag and hasattr(self.rag, 'retrieve_context_text'):
                     try:
-                        rag_results = self.rag.retrieve_context(
+                        rag_text = self.rag.retrieve_context_text(
                             f"Oracle recovery {scenario} français procédure",
-                            n_results=2
+                            n_results=2,
+                            max_chars=200
                         )
-                        if rag_results:
-                            context += "\n" + "\n".join([doc['content'][:200] for doc in rag_results])
+                        if rag_text:
+                            context += "\n" + rag_text
                     except Exception as rag_error:
                         print(f"⚠️  Erreur RAG: {rag_error}")
 
@@ -13,8 +13,10 @@ Utilise les fichiers CSV extraits par data_extractor.py
 
 import json
 import logging
+import re
 import pandas as pd
 import os
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 from typing import Dict, Any, List, Optional
 from llm_engine import LLMEngine
@@ -23,6 +25,9 @@ from llm_engine import LLMEngine
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Enveloppe ```json ... ``` autour des réponses LLM
+_JSON_FENCE_RE = re.compile(r"^```json\s*|\s*```$", re.MULTILINE)
+
 class SecurityAudit:
     """
     Comprehensive security audit class for Oracle databases.
@@ -240,6 +245,37 @@ class SecurityAudit:
             self.audit_results['profiles'] = result
             return result
 
+    def run_component_audits(self, config: Dict[str, Any] = None) -> str:
+        """
+        Run the users/roles, privileges and profiles audits concurrently
+        (one LLM call each, independent of each other) and compile the report.
+
+        Args:
+            config: Security configuration (loaded from CSV files if omitted)
+
+        Returns:
+            Formatted audit report
+        """
+        if config is None:
+            config = self.load_security_data_from_csv()
+
+        audits = (
+            ('users_roles', self.audit_users_roles),
+            ('privileges', self.audit_privileges),
+            ('profiles', self.audit_profiles)
+        )
+        with ThreadPoolExecutor(max_workers=len(audits)) as executor:
+            futures = [executor.submit(audit, config) for _, audit in audits]
+            for future in futures:
+                future.result()
+
+        # Same component order as sequential calls, whichever finished first
+        ordered = {name: self.audit_results[name] for name, _ in audits}
+        ordered.update(self.audit_results)
+        self.audit_results = ordered
+
+        return self._compile_report()
+
     def generate_full_report(self) -> str:
         """
         Generate comprehensive security audit report using CSV data and LLM for JSON output.
@@ -376,12 +412,13 @@ class SecurityAudit:
                 admin_option = priv.get('ADMIN_OPTION', 'NO')
                 
                 # Highlight dangerous privileges
+                privilege_upper = str(privilege).upper()
                 danger_level = "⚠️ "
-                if 'ANY' in str(privilege).upper():
+                if 'ANY' in privilege_upper:
                     danger_level = "🔴 "
-                elif 'CREATE' in str(privilege).upper() or 'DROP' in str(privilege).upper():
+                elif 'CREATE' in privilege_upper or 'DROP' in privilege_upper:
                     danger_level = "🟠 "
-                elif 'SELECT' in str(privilege).upper():
+                elif 'SELECT' in privilege_upper:
                     danger_level = "🟡 "
                 
                 lines.append(f"{danger_level}{i}. {grantee}: {privilege} (Admin: {admin_option})")
@@ -553,10 +590,9 @@ class SecurityAudit:
         Parse LLM response and ensure it's valid JSON.
         Remove code formatting backticks if present.
         """
-        import re
         try:
             # Remove ```json ... ``` wrapper
-            cleaned_response = re.sub(r"^```json\s*|\s*```$", "", llm_response.strip(), flags=re.MULTILINE)
+            cleaned_response = _JSON_FENCE_RE.sub("", llm_response.strip())
             return json.loads(cleaned_response)
         except json.JSONDecodeError:
             logger.warning("LLM response is not valid JSON, returning raw text instead")
@@ -0,0 +1,174 @@
+# tests/test_llm_cache.py - Cache de réponses du LLMEngine (sans appel réseau)
+import sys
+import os
+from types import SimpleNamespace
+
+# Ajoute le dossier parent (Projet_DBA) au chemin Python
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.append(os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "src"))
+
+from src.llm_engine import LLMEngine
+
+PROMPTS_FILE = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "data", "prompts.yaml")
+
+
+class FakeCompletions:
+    """Client Groq factice : répond avec un numéro d'appel et le message utilisateur"""
+
+    def __init__(self):
+        self.calls = 0
+
+    def create(self, model, messages, **kwargs):
+        self.calls += 1
+        content = f"réponse {self.calls}: {messages[-1]['content'][-60:]}"
+        return SimpleNamespace(choices=[SimpleNamespace(message=SimpleNamespace(content=content))])
+
+
+class FakeStream:
+    """Flux Groq factice : un fragment par chunk, compte les fragments consommés"""
+
+    def __init__(self, fragments):
+        self.fragments = fragments
+        self.consumed = 0
+
+    def __iter__(self):
+        for fragment in self.fragments:
+            self.consumed += 1
+            yield SimpleNamespace(choices=[SimpleNamespace(delta=SimpleNamespace(content=fragment))])
+
+    def close(self):
+        pass
+
+
+class FakeStreamingCompletions(FakeCompletions):
+    """Répond en flux : la catégorie est coupée entre deux fragments"""
+
+    def __init__(self):
+        super().__init__()
+        self.streams = []
+
+    def create(self, model, messages, stream=False, **kwargs):
+        if not stream:
+            return super().create(model, messages, **kwargs)
+        self.calls += 1
+        self.streams.append(FakeStream(["La catégorie est secur", "ity_aud", "it car ", "la question", " porte sur..."]))
+        return self.streams[-1]
+
+
+def same_vector_embedder(text):
+    """Pire cas : tous les textes ont le même embedding (similarité 1.0)"""
+    return [1.0, 0.0, 0.0]
+
+
+def make_engine(embed_fn=same_vector_embedder, cache_path=None):
+    engine = LLMEngine(api_key="test-key", prompts_file=PROMPTS_FILE, embed_fn=embed_fn,
+                       cache_path=cache_path)
+    completions = FakeCompletions()
+    engine.client = SimpleNamespace(chat=SimpleNamespace(completions=completions))
+    return engine, completions
+
+
+def test_structured_calls_never_share_answers():
+    """Deux configs / logs différents avec le même template : deux appels, deux réponses"""
+    engine, completions = make_engine()
+
+    config_a = {'users': [{'username': 'SCOTT', 'account_status': 'OPEN'}]}
+    config_b = {'users': [{'username': 'HR', 'account_status': 'LOCKED'}]}
+    audit_a = engine.assess_security(config_a)
+    audit_b = engine.assess_security(config_b)
+    assert completions.calls == 2
+    assert audit_a != audit_b
+
+    log_a = {'timestamp': '2024-01-08 10:00:00', 'user': 'APP_USER', 'action': 'SELECT', 'object': 'EMP'}
+    log_b = {'timestamp': '2024-01-08 03:00:00', 'user': 'HACKER', 'action': 'DROP', 'object': 'AUD$'}
+    anomaly_a = engine.detect_anomaly(log_a)
+    anomaly_b = engine.detect_anomaly(log_b)
+    assert completions.calls == 4
+    assert anomaly_a != anomaly_b
+
+
+def test_exact_tier_reuses_identical_calls():
+    engine, completions = make_engine(embed_fn=None)
+    config = {'users': [{'username': 'SCOTT', 'account_status': 'OPEN'}]}
+    first = engine.assess_security(config)
+    second = engine.assess_security(config)
+    assert completions.calls == 1
+    assert first == second
+
+
+def test_max_tokens_is_part_of_the_key():
+    """Une réponse courte (potentiellement tronquée) n'est jamais servie à un appel plus long"""
+    engine, completions = make_engine(embed_fn=None)
+    engine.generate("Explique RMAN", max_tokens=20)
+    engine.generate("Explique RMAN", max_tokens=3000)
+    assert completions.calls == 2
+    engine.generate("Explique RMAN", max_tokens=3000)
+    assert completions.calls == 2
+
+
+def test_semantic_tier_is_opt_in():
+    engine, completions = make_engine()
+
+    engine.generate("Qu'est-ce que RMAN ?", max_tokens=200)
+    engine.generate("C'est quoi RMAN ?", max_tokens=200)
+    assert completions.calls == 2  # pas d'opt-in : seul le cache exact s'applique
+
+    first = engine.generate("Qu'est-ce que Data Guard ?", semantic_cache=True)
+    second = engine.generate("C'est quoi Data Guard ?", semantic_cache=True)
+    assert completions.calls == 3  # opt-in : question proche servie depuis le cache
+    assert first == second
+
+    # Contexte différent : jamais de réutilisation sémantique
+    engine.generate("Data Guard, c'est quoi ?", context="Autre contexte", semantic_cache=True)
+    assert completions.calls == 4
+
+
+def test_persistent_cache_survives_restart(tmp_path=None):
+    import tempfile
+    directory = str(tmp_path) if tmp_path else tempfile.mkdtemp()
+    cache_path = os.path.join(directory, "llm_cache", "responses.jsonl")
+
+    engine, completions = make_engine(embed_fn=None, cache_path=cache_path)
+    engine.cache_size = 2
+    answers = [engine.generate(f"Question {i}") for i in range(5)]
+    assert completions.calls == 5
+
+    # Nouvelle instance : les entrées les plus récentes sont relues du fichier
+    engine, completions = make_engine(embed_fn=None, cache_path=cache_path)
+    assert engine.generate("Question 4") == answers[4]
+    assert completions.calls == 0
+
+    # Fichier compacté (ajout ligne par ligne, réécriture bornée), pas de fichier temporaire restant
+    with open(cache_path, 'rb') as f:
+        assert len(f.read().splitlines()) <= 2 * 2
+    assert os.listdir(os.path.dirname(cache_path)) == ["responses.jsonl"]
+
+    engine.clear_cache()
+    engine, completions = make_engine(embed_fn=None, cache_path=cache_path)
+    engine.generate("Question 4")
+    assert completions.calls == 1
+
+
+def test_streamed_intent_is_cached():
+    engine, _ = make_engine(embed_fn=None)
+    completions = FakeStreamingCompletions()
+    engine.client = SimpleNamespace(chat=SimpleNamespace(completions=completions))
+
+    assert engine.classify_intent_with_confidence("Audite les privilèges") == "SECURITY_AUDIT"
+    assert completions.streams[0].consumed == 3  # flux arrêté dès la catégorie complète
+    assert engine.classify_intent_with_confidence("Audite les privilèges") == "SECURITY_AUDIT"
+    assert completions.calls == 1  # deuxième appel servi par le cache
+
+
+if __name__ == "__main__":
+    print("=" * 60)
+    print("🧪 TEST cache de réponses LLMEngine")
+    print("=" * 60)
+    for test in (test_structured_calls_never_share_answers,
+                 test_exact_tier_reuses_identical_calls,
+                 test_max_tokens_is_part_of_the_key,
+                 test_semantic_tier_is_opt_in,
+                 test_persistent_cache_survives_restart,
+                 test_streamed_intent_is_cached):
+        test()
+        print(f"✅ {test.__name__}")
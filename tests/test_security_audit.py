@@ -0,0 +1,60 @@
+# tests/test_security_audit.py - Audits de sécurité par composant en parallèle (sans appel réseau)
+import sys
+import os
+import threading
+import time
+
+# Ajoute le dossier parent (Projet_DBA) au chemin Python
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.append(os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "src"))
+
+from src.security_audit import SecurityAudit
+
+
+class BarrierLLM:
+    """
+    LLMEngine factice : chaque appel attend que les trois audits soient en
+    cours en même temps (en série, la barrière expire). L'audit users/roles
+    termine en dernier.
+    """
+
+    def __init__(self):
+        self.prompts = {}
+        self.barrier = threading.Barrier(3, timeout=5)
+
+    def assess_security(self, config):
+        self.barrier.wait()
+        time.sleep(0.05)
+        return "évaluation utilisateurs"
+
+    def generate(self, prompt, **kwargs):
+        self.barrier.wait()
+        return "évaluation profils" if "profils" in prompt else "évaluation privilèges"
+
+
+CONFIG = {
+    'users': [{'USERNAME': 'SCOTT', 'ACCOUNT_STATUS': 'OPEN'}],
+    'privileges': [{'GRANTEE': 'SCOTT', 'PRIVILEGE': 'DROP ANY TABLE', 'ADMIN_OPTION': 'NO'}],
+    'profiles': [],
+    'roles': []
+}
+
+
+def test_component_audits_run_concurrently_in_order():
+    audit = SecurityAudit(llm_engine=BarrierLLM())
+    report = audit.run_component_audits(CONFIG)
+
+    assert list(audit.audit_results) == ['users_roles', 'privileges', 'profiles']
+    assert all(result['status'] == 'completed' for result in audit.audit_results.values())
+    assert audit.audit_results['users_roles']['assessment'] == "évaluation utilisateurs"
+
+    positions = [report.index(f"Component: {name}") for name in ('USERS ROLES', 'PRIVILEGES', 'PROFILES')]
+    assert positions == sorted(positions)
+
+
+if __name__ == "__main__":
+    print("=" * 60)
+    print("🧪 TEST audits de sécurité en parallèle")
+    print("=" * 60)
+    test_component_audits_run_concurrently_in_order()
+    print("✅ test_component_audits_run_concurrently_in_order")